@@ -12,9 +12,16 @@ import os
 from pathlib import Path
 import numpy as np
 from datetime import datetime
+import sys
+
+# RankIndex is shared with the linkedin_project scripts
+sys.path.insert(0, str(Path(__file__).parent / "linkedin_project" / "src_common"))
+from rank_index import RankIndex
 
 # Project structure
 DATA_PATH = "Master.csv"
+# Indicators the dashboard looks up by country
+INDEXED_COLUMNS = ['CAD/INS', 'INS/FA', 'Currency and deposits']
 OUTPUT_DIR = Path("assets") / "interactive_charts"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -348,20 +355,26 @@ def create_trend_chart(ratio_name, italy_value, eu_value, title, subtitle=""):
     
     return fig
 
-def create_analytical_dashboard(df):
-    """Create a professional analytical dashboard with interactive charts."""
+def create_analytical_dashboard(df, index=None):
+    """Create a professional analytical dashboard with interactive charts.
+    
+    index is the RankIndex built with the dataset (built here if not given).
+    """
     # Define color map for consistent colors
     color_map = {'Italy': COLOR_PALETTE['italy'], 'EU': COLOR_PALETTE['eu']}
     
+    if index is None:
+        index = RankIndex(df, INDEXED_COLUMNS)
+    
     # Extract key values for convenience
-    italy_cadins = df[df['Country'] == 'Italy']['CAD/INS'].values[0]
-    eu_cadins = df[df['Country'] == 'EU']['CAD/INS'].values[0]
+    italy_cadins = index.value('Italy', 'CAD/INS')
+    eu_cadins = index.value('EU', 'CAD/INS')
     
-    italy_insfa = df[df['Country'] == 'Italy']['INS/FA'].values[0]
-    eu_insfa = df[df['Country'] == 'EU']['INS/FA'].values[0]
+    italy_insfa = index.value('Italy', 'INS/FA')
+    eu_insfa = index.value('EU', 'INS/FA')
     
-    italy_cad = df[df['Country'] == 'Italy']['Currency and deposits'].values[0]
-    eu_cad = df[df['Country'] == 'EU']['Currency and deposits'].values[0]
+    italy_cad = index.value('Italy', 'Currency and deposits')
+    eu_cad = index.value('EU', 'Currency and deposits')
     
     # Get current date for the report
     today = datetime.now().strftime("%B %d, %Y")
@@ -764,8 +777,11 @@ def main():
     # Parse data from CSV
     df = parse_csv_data()
     
+    # Index the values once with the dataset instead of filtering it for every lookup
+    index = RankIndex(df, INDEXED_COLUMNS)
+    
     # Create professional analytics dashboard
-    dashboard = create_analytical_dashboard(df)
+    dashboard = create_analytical_dashboard(df, index)
     
     print("Professional analytics dashboard created successfully!")
     print(f"View the complete dashboard at: {OUTPUT_DIR}/financial_analysis_dashboard.html")
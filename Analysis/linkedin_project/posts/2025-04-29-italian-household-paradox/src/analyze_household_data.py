@@ -11,6 +11,10 @@ PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 OUTPUT_DIR = PROJECT_ROOT / "assets" / "charts"
 
+# Shared helpers live in the linkedin_project src_common folder
+sys.path.insert(0, str(PROJECT_ROOT.parent.parent / "src_common"))
+from rank_index import RankIndex
+
 # Create output directory if it doesn't exist
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -108,6 +112,39 @@ def read_master_data(filename='Master.csv'):
         print(f"Error reading data: {e}")
         return None
 
+# Parsed datasets keyed by filename, each with the mtime it was read at
+_dataset_cache = {}
+
+# Indicators covered by the rank index
+RANKED_COLUMNS = [
+    'Currency and deposits',
+    'Insurance, pensions and standardised guarantees',
+    'AIC ON GPD',
+    'AIC ON CAD',
+    'CAD on INS',
+    'Ins on FA',
+    'FA ON GDP'
+]
+
+def load_dataset(filename='Master.csv'):
+    """Reads the data once and builds the rank index alongside it.
+    
+    Returns a (DataFrame, RankIndex) tuple, or (None, None) if reading fails.
+    """
+    try:
+        mtime = os.path.getmtime(DATA_DIR / filename)
+    except OSError:
+        mtime = None
+    
+    cached = _dataset_cache.get(filename)
+    if cached is None or cached['mtime'] != mtime:
+        df = read_master_data(filename)
+        rank_index = RankIndex(df, RANKED_COLUMNS) if df is not None else None
+        cached = {'mtime': mtime, 'data': df, 'rank_index': rank_index}
+        _dataset_cache[filename] = cached
+    
+    return cached['data'], cached['rank_index']
+
 # Create a bar chart comparing Italy and EU
 def create_comparison_chart(df, column, title, filename):
     """Creates a bar chart comparing Italy and EU for a given metric."""
@@ -146,21 +183,12 @@ def create_comparison_chart(df, column, title, filename):
     return filename
 
 # Create a bar chart showing EU countries ranking
-def create_eu_ranking(df, column, title, filename, highlight_country='Italy'):
+def create_eu_ranking(df, column, title, filename, highlight_country='Italy', rank_index=None):
     """Creates a bar chart showing EU country rankings for a metric."""
-    # Sort by the column value
-    sorted_df = df.copy()
-    
-    # Clean the data - remove % signs and convert to float
-    if sorted_df[column].dtype == object:
-        # European format handling: replace dots in thousands with nothing, then replace comma with dot
-        sorted_df[column] = sorted_df[column].str.replace('%', '')
-        sorted_df[column] = sorted_df[column].apply(lambda x: 
-            float(x.replace('.', '').replace(',', '.')) if isinstance(x, str) else x
-        )
-    
-    # Sort after conversion
-    sorted_df = sorted_df.sort_values(by=column, ascending=False)
+    # Reuse the precomputed ranking when available, it is already cleaned and sorted
+    if rank_index is None:
+        rank_index = RankIndex(df, [column])
+    sorted_df = rank_index.ranking(column)
     
     # Create a bar chart
     fig = px.bar(sorted_df, x='Country', y=column, title=title,
@@ -289,7 +317,7 @@ def create_inflation_impact(initial_amount=1.5, inflation_rate=0.053, years=5, f
 # Main function
 def main():
     # Read the data
-    df = read_master_data()
+    df, rank_index = load_dataset()
     
     if df is not None:
         # Create comparison charts
@@ -299,9 +327,9 @@ def main():
         create_comparison_chart(df, 'Ins on FA', 'Insurance to Financial Assets Ratio (%)', 'italy_eu_ins_fa_ratio')
         
         # Create EU rankings
-        create_eu_ranking(df, 'Currency and deposits', 'EU Countries by Cash Holdings (Trillion €)', 'eu_deposits_ranking')
-        create_eu_ranking(df, 'CAD on INS', 'EU Countries by Cash to Insurance Ratio (%)', 'eu_cad_ins_ranking')
-        create_eu_ranking(df, 'Ins on FA', 'EU Countries by Insurance to Financial Assets Ratio (%)', 'eu_ins_fa_ranking')
+        create_eu_ranking(df, 'Currency and deposits', 'EU Countries by Cash Holdings (Trillion €)', 'eu_deposits_ranking', rank_index=rank_index)
+        create_eu_ranking(df, 'CAD on INS', 'EU Countries by Cash to Insurance Ratio (%)', 'eu_cad_ins_ranking', rank_index=rank_index)
+        create_eu_ranking(df, 'Ins on FA', 'EU Countries by Insurance to Financial Assets Ratio (%)', 'eu_ins_fa_ranking', rank_index=rank_index)
         
         # Create radar chart
         radar_columns = ['AIC ON GPD', 'AIC ON CAD', 'CAD on INS', 'Ins on FA', 'FA ON GDP']
@@ -0,0 +1,89 @@
+import pandas as pd
+import numpy as np
+
+
+def clean_numeric(series):
+    """Convert a column of European formatted strings ('1.577,4', '150%') to floats."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    cleaned = (series.str.replace('%', '', regex=False)
+                     .str.replace('.', '', regex=False)
+                     .str.replace(',', '.', regex=False)
+                     .str.strip())
+    return pd.to_numeric(cleaned, errors='coerce')
+
+
+class RankIndex:
+    """Rankings of every country for every indicator and year, built once.
+
+    Orders come from a single argsort over the (year x country x indicator)
+    matrix, so "where does Italy stand" is an array lookup instead of a
+    re-clean and re-sort of the whole DataFrame.
+
+    Ranks are 1-based with 1 for the highest value. Percentiles run from 0
+    (lowest) to 100 (highest). Missing values are ranked last and get NaN
+    rank, percentile and distance to median.
+    """
+
+    def __init__(self, df, indicators, country_col='Country', year_col=None):
+        self.indicators = list(indicators)
+        self.countries = list(pd.unique(df[country_col]))
+        self.years = sorted(df[year_col].unique()) if year_col else [None]
+
+        self._country_pos = {c: i for i, c in enumerate(self.countries)}
+        self._indicator_pos = {ind: i for i, ind in enumerate(self.indicators)}
+        self._year_pos = {y: i for i, y in enumerate(self.years)}
+
+        values = np.full((len(self.years), len(self.countries), len(self.indicators)), np.nan)
+        rows = df[country_col].map(self._country_pos).to_numpy()
+        years = df[year_col].map(self._year_pos).to_numpy() if year_col else np.zeros(len(df), dtype=int)
+        for j, indicator in enumerate(self.indicators):
+            values[years, rows, j] = clean_numeric(df[indicator]).to_numpy()
+        self.values = values
+
+        # Descending order with missing values last
+        self.order = np.argsort(np.where(np.isnan(values), np.inf, -values), axis=1, kind='stable')
+        positions = np.empty_like(self.order)
+        np.put_along_axis(positions, self.order, np.arange(len(self.countries))[None, :, None], axis=1)
+
+        missing = np.isnan(values)
+        self.count = (~missing).sum(axis=1)
+        self.rank = np.where(missing, np.nan, positions + 1.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.percentile = np.where(
+                missing, np.nan,
+                (self.count[:, None, :] - self.rank) / np.maximum(self.count[:, None, :] - 1, 1) * 100
+            )
+        self.median = np.nanmedian(np.where(missing, np.nan, values), axis=1)
+        self.distance_to_median = values - self.median[:, None, :]
+
+    def _key(self, indicator, year):
+        return self._year_pos[year if year is not None else self.years[-1]], self._indicator_pos[indicator]
+
+    def value(self, country, indicator, year=None):
+        """Return the cleaned value of an indicator for a country."""
+        y, j = self._key(indicator, year)
+        return self.values[y, self._country_pos[country], j]
+
+    def position(self, country, indicator, year=None):
+        """Return where a country stands for an indicator."""
+        y, j = self._key(indicator, year)
+        i = self._country_pos[country]
+        return {
+            'value': self.values[y, i, j],
+            'rank': self.rank[y, i, j],
+            'count': int(self.count[y, j]),
+            'percentile': self.percentile[y, i, j],
+            'distance_to_median': self.distance_to_median[y, i, j]
+        }
+
+    def ranking(self, indicator, year=None):
+        """Return a DataFrame of countries sorted from highest to lowest value."""
+        y, j = self._key(indicator, year)
+        order = self.order[y, :, j]
+        return pd.DataFrame({
+            'Country': np.array(self.countries, dtype=object)[order],
+            indicator: self.values[y, order, j],
+            'rank': self.rank[y, order, j],
+            'percentile': self.percentile[y, order, j]
+        })
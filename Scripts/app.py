@@ -1,13 +1,50 @@
 # app.py
 import csv
-from flask import Flask, render_template
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from flask import Flask, Response, render_template, request
+from jinja2 import TemplateNotFound
+import plotly
 import plotly.express as px
 import plotly.io as pio
+from plotly.offline import get_plotlyjs_version
 import pandas as pd
 
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip is always available
+    brotli = None
+
 app = Flask(__name__)
 
-def read_data(filename='Master.csv'):
+DATA_FILE = 'Master.csv'
+
+# Charts shown on the infographic: (name, metric, title, y-axis format)
+CHARTS = [
+    ('chart_aic_gdp', 'AIC_GDP', 'Actual Individual Consumption / GDP', '.1%'),
+    ('chart_aic_cad', 'AIC_CAD', 'Actual Individual Consumption / Currency & Deposits', '.1%'),
+    ('chart_cad_ins', 'CAD_INS', 'Currency & Deposits / Insurance & Pensions', '.1%'),
+    ('chart_ins_fa', 'INS_FA', 'Insurance & Pensions / Financial Assets', '.1%'),
+    ('chart_fa_gdp', 'FA_GDP', 'Financial Assets / GDP', '.1f'),  # Not a percentage
+]
+
+# Maximum number of serialized chart specs kept in memory
+CHART_CACHE_SIZE = 64
+
+# Maximum number of encoded response bodies kept in memory
+RESPONSE_CACHE_SIZE = 64
+
+# Plotly theme shared by all charts, serialized once and applied client-side
+CHART_TEMPLATE = json.dumps(pio.templates['plotly'].to_plotly_json(), separators=(',', ':'))
+
+# plotly.js release matching the installed plotly, older ones cannot decode its typed arrays
+PLOTLYJS_VERSION = get_plotlyjs_version()
+
+def read_data(filename=DATA_FILE):
     """Reads the relevant data from the CSV file."""
     data = {}
     try:
@@ -71,10 +108,13 @@ def read_data(filename='Master.csv'):
         return None
 
 
-def create_bar_chart(data, y_col, title, y_format='.1%'):
-    """Creates a Plotly bar chart comparing Italy and EU for a given metric."""
+def create_bar_figure(data, y_col, title, y_format='.1%'):
+    """Creates a Plotly bar chart comparing Italy and EU for a given metric.
+
+    Returns (figure, error message); the figure is None when there is nothing to plot.
+    """
     if not data or not data.get("Italy") or not data.get("EU"):
-        return "<div>Error generating chart: Data unavailable</div>"
+        return None, "Error generating chart: Data unavailable"
         
     plot_data = [
         {'Region': 'Italy', 'Value': data['Italy'].get(y_col)},
@@ -84,7 +124,7 @@ def create_bar_chart(data, y_col, title, y_format='.1%'):
     plot_data = [item for item in plot_data if item['Value'] is not None]
     
     if not plot_data:
-         return f"<div>Error generating chart '{title}': No valid data for Italy or EU</div>"
+         return None, f"Error generating chart '{title}': No valid data for Italy or EU"
 
     df = pd.DataFrame(plot_data)
     
@@ -92,33 +132,230 @@ def create_bar_chart(data, y_col, title, y_format='.1%'):
                  color='Region', color_discrete_map={'Italy': 'green', 'EU': 'red'},
                  labels={'Value': title.split('(')[0].strip()}) # Use cleaner label
     fig.update_layout(yaxis_tickformat=y_format, showlegend=False)
-    
-    # Convert figure to HTML div
-    chart_html = pio.to_html(fig, full_html=False, include_plotlyjs='cdn')
-    return chart_html
+    return fig, None
+
+
+def create_chart_spec(data, y_col, title, y_format='.1%'):
+    """Creates the compact JSON figure spec for a metric, for client-side rendering.
+
+    The Plotly theme is left out, it is sent once with /api/charts (CHART_TEMPLATE),
+    see get_themed_chart_spec for a spec that stands alone.
+    """
+    fig, error = create_bar_figure(data, y_col, title, y_format=y_format)
+    if fig is None:
+        return json.dumps({'error': error})
+    fig.update_layout(template=None)
+    return pio.to_json(fig, validate=False, pretty=False, remove_uids=True)
+
+class DataCache:
+    """Keeps the parsed CSV in memory and re-reads it only when the file changes."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._data = None
+        self._fingerprint = None
+
+    def get(self):
+        """Returns (data, fingerprint), or (None, None) if the data cannot be loaded."""
+        try:
+            mtime = os.path.getmtime(self.filename)
+        except OSError:
+            mtime = None
+
+        with self._lock:
+            if self._data is None or mtime != self._mtime:
+                data = read_data(self.filename)
+                self._mtime = mtime
+                self._data = data
+                # Fingerprint the parsed values so unchanged content keeps its cached charts
+                self._fingerprint = (
+                    hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+                    if data is not None else None
+                )
+            return self._data, self._fingerprint
+
+
+class LRUCache:
+    """Thread-safe LRU cache for serialized charts and response bodies."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get_or_create(self, key, create):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+
+        # Render outside the lock, a duplicate render on a cold key is harmless
+        value = create()
+
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return value
+
+
+data_cache = DataCache(DATA_FILE)
+chart_cache = LRUCache(CHART_CACHE_SIZE)
+response_cache = LRUCache(RESPONSE_CACHE_SIZE)
+
+
+def get_chart_spec(data, fingerprint, y_col, title, y_format):
+    """Returns the JSON spec for a metric, serializing it only once per data version."""
+    return chart_cache.get_or_create(
+        ('json', y_col, title, y_format, fingerprint),
+        lambda: create_chart_spec(data, y_col, title, y_format=y_format)
+    )
+
+
+def get_themed_chart_spec(data, fingerprint, y_col, title, y_format):
+    """Returns the JSON spec for a metric with the Plotly theme in its layout, for single chart requests."""
+    def create():
+        spec = json.loads(get_chart_spec(data, fingerprint, y_col, title, y_format))
+        if 'layout' in spec:
+            spec['layout']['template'] = json.loads(CHART_TEMPLATE)
+        return json.dumps(spec, separators=(',', ':'))
+    return chart_cache.get_or_create(('themed', y_col, title, y_format, fingerprint), create)
+
+
+def json_response(body, status=200):
+    """Wraps an already serialized JSON string in a response."""
+    return Response(body, status=status, mimetype='application/json')
+
+
+_app_version = None
+
+
+def app_version():
+    """Hashes this module, the page template and the plotly version, which decide what a response looks like.
+
+    Part of every ETag, so a deploy that changes the page or the charts
+    is not hidden behind 304s until the data changes.
+    """
+    global _app_version
+    if _app_version is None:
+        digest = hashlib.sha1(plotly.__version__.encode('utf-8'))
+        with open(__file__, 'rb') as f:
+            digest.update(f.read())
+        try:
+            source, _, _ = app.jinja_loader.get_source(app.jinja_env, 'index.html')
+            digest.update(source.encode('utf-8'))
+        except TemplateNotFound:
+            pass
+        _app_version = digest.hexdigest()
+    return _app_version
+
+
+def make_etag(fingerprint):
+    """Builds a strong ETag from the app version, the data fingerprint and the request path and parameters."""
+    params = sorted(request.args.items(multi=True))
+    key = json.dumps([app_version(), fingerprint, request.path, params])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def compress_body(body, encoding):
+    """Compresses a response body with the negotiated content encoding."""
+    if encoding == 'br':
+        return brotli.compress(body)
+    # mtime=0 keeps the gzip output identical for identical bodies
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def cached_response(fingerprint, render, mimetype):
+    """Serves a body under a strong ETag, encoding it only once per content encoding.
+
+    Answers 304 when the client already has the current version, without
+    calling render at all. Otherwise the rendered and compressed bodies come
+    from the response cache while the data is unchanged. Each content
+    encoding is a different representation, so it gets its own ETag.
+    """
+    encoding = None
+    if request.accept_encodings:
+        encoding = request.accept_encodings.best_match(['br', 'gzip'] if brotli else ['gzip'])
+
+    base_etag = make_etag(fingerprint)
+    etag = f"{base_etag}-{encoding}" if encoding else base_etag
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        raw = response_cache.get_or_create((base_etag, None), lambda: render().encode('utf-8'))
+        body = raw
+        if encoding:
+            body = response_cache.get_or_create((base_etag, encoding), lambda: compress_body(raw, encoding))
+
+        response = Response(body, mimetype=mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    # Let clients keep the body but revalidate it on every use
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 
 @app.route('/')
 def index():
-    """Renders the infographic page."""
-    household_data = read_data()
+    """Renders the infographic page, the charts are drawn client-side from /api/charts."""
+    household_data, fingerprint = data_cache.get()
     
     if household_data is None:
         # Render a basic error page or message if data loading fails
         return "<h1>Error loading data from Master.csv</h1><p>Please check the file and Flask console output.</p>", 500
 
-    # Generate charts
-    chart_aic_gdp = create_bar_chart(household_data, 'AIC_GDP', 'Actual Individual Consumption / GDP')
-    chart_aic_cad = create_bar_chart(household_data, 'AIC_CAD', 'Actual Individual Consumption / Currency & Deposits')
-    chart_cad_ins = create_bar_chart(household_data, 'CAD_INS', 'Currency & Deposits / Insurance & Pensions')
-    chart_ins_fa = create_bar_chart(household_data, 'INS_FA', 'Insurance & Pensions / Financial Assets')
-    chart_fa_gdp = create_bar_chart(household_data, 'FA_GDP', 'Financial Assets / GDP', y_format = '.1f') # Not a percentage
-
-    return render_template('index.html',
-                           chart_aic_gdp=chart_aic_gdp,
-                           chart_aic_cad=chart_aic_cad,
-                           chart_cad_ins=chart_cad_ins,
-                           chart_ins_fa=chart_ins_fa,
-                           chart_fa_gdp=chart_fa_gdp)
+    return cached_response(
+        fingerprint,
+        lambda: render_template(
+            'index.html',
+            charts=[(y_col, title) for _, y_col, title, _ in CHARTS],
+            plotlyjs_version=PLOTLYJS_VERSION
+        ),
+        'text/html'
+    )
+
+
+@app.route('/api/charts')
+def all_chart_specs():
+    """Returns the figure specs for every metric in one response."""
+    household_data, fingerprint = data_cache.get()
+    if household_data is None:
+        return json_response(json.dumps({'error': 'Error loading data'}), 500)
+
+    def render():
+        # Specs are cached as JSON strings, so the response is assembled without re-serializing
+        specs = ','.join(
+            f'{json.dumps(y_col)}:{get_chart_spec(household_data, fingerprint, y_col, title, y_format)}'
+            for _, y_col, title, y_format in CHARTS
+        )
+        return f'{{"fingerprint":{json.dumps(fingerprint)},"template":{CHART_TEMPLATE},"charts":{{{specs}}}}}'
+
+    return cached_response(fingerprint, render, 'application/json')
+
+
+@app.route('/api/charts/<metric>')
+def chart_spec(metric):
+    """Returns the figure spec for a single metric, theme included."""
+    chart = next((c for c in CHARTS if c[1] == metric), None)
+    if chart is None:
+        return json_response(json.dumps({'error': f'Unknown metric: {metric}'}), 404)
+
+    household_data, fingerprint = data_cache.get()
+    if household_data is None:
+        return json_response(json.dumps({'error': 'Error loading data'}), 500)
+
+    _, y_col, title, y_format = chart
+    return cached_response(
+        fingerprint,
+        lambda: get_themed_chart_spec(household_data, fingerprint, y_col, title, y_format),
+        'application/json'
+    )
 
 if __name__ == '__main__':
     app.run(debug=True) # debug=True is helpful for development 
\ No newline at end of file
@@ -1,6 +1,5 @@
 import pandas as pd
 import plotly.graph_objects as go
-import country_converter as coco
 import numpy as np
 from plotly.subplots import make_subplots
 import plotly.express as px
@@ -8,20 +7,7 @@ import base64
 import os
 from scipy import stats
 import math
-
-def convert_european_number(x):
-    if pd.isna(x):
-        return np.nan
-    try:
-        # Remove any leading/trailing whitespace and tabs
-        x = str(x).strip().replace('\t', '')
-        # Remove % sign if present
-        x = x.rstrip('%')
-        # Replace comma with dot for decimal point
-        x = x.replace('.', '').replace(',', '.')
-        return float(x)
-    except:
-        return np.nan
+from eurostat_data import load_dataset
 
 def calculate_trendline(x, y):
     """Calculate trendline and R-squared value"""
@@ -31,77 +17,53 @@ def calculate_trendline(x, y):
     line_y = slope * line_x + intercept
     return line_x, line_y, r_squared
 
-# Read the data
-df = pd.read_csv('Fonti per post linkedin liquidità/Master Dati Eurostat.csv', 
-                 skiprows=1,  # Skip only the first row to get proper column alignment
-                 sep=';', 
-                 na_values=[':'])
-
-# Clean up the data - now include all countries except the EU row (which is at the end)
-df = df[df['Country'].notna() & (df['Country'] != 'EU')]  # Remove empty rows and EU row
-
-# Convert all relevant columns
-columns_to_convert = {
-    'Legend': 0,  # Column A
-    'Country': 1,  # Column B
-    'Currency and deposits': 2,  # Column C
-    'Debt securities': 3,  # Column D
-    'Loans': 4,  # Column E
-    'Equity and investment fund shares': 5,  # Column F
-    'Insurance, pensions and standardised guarantees': 6,  # Column G
-    'Financial derivatives and employee stock options': 7,  # Column H
-    'Other accounts receivable/\npayable': 8,  # Column I
-    'GDP 2023 Billion Euro': 9,  # Column J
-    'AIC 2023': 10,  # Column K
-    'pop M': 16,  # Column Q
-    'AIC per person': 17,  # Column R
-    'Ins on FA': 14,  # Column O
-}
-
-# Create clean DataFrame with converted values
-clean_df = pd.DataFrame()
-for col_name, col_idx in columns_to_convert.items():
-    if col_name in ['Legend', 'Country']:
-        clean_df[col_name] = df.iloc[:, col_idx].str.strip()
-    else:
-        clean_df[col_name] = df.iloc[:, col_idx].apply(convert_european_number)
-
-# Calculate total financial assets and percentages for pie charts
-financial_columns = [
-    'Currency and deposits',
-    'Equity and investment fund shares',
-    'Insurance, pensions and standardised guarantees',
-    'Debt securities',
-    'Loans',
-    'Financial derivatives and employee stock options',
-    'Other accounts receivable/\npayable'
-]
+# Bootstrap confidence bands around the trend lines
+SHOW_TREND_BANDS = True
+BOOTSTRAP_RESAMPLES = 10000
+BOOTSTRAP_SEED = 42
 
-# Calculate total financial assets
-clean_df['Total Financial Assets'] = clean_df[financial_columns].sum(axis=1)
+def bootstrap_trend_band(x, y, n_resamples=BOOTSTRAP_RESAMPLES, ci=0.95, seed=BOOTSTRAP_SEED, n_points=50):
+    """Calculate a bootstrap confidence band for the trendline.
 
-# Calculate percentages for each financial asset type
-for col in financial_columns:
-    clean_df[f'{col}_pct'] = clean_df[col] / clean_df['Total Financial Assets'] * 100
+    All resamples are drawn as one index matrix and fitted together with the
+    closed-form least-squares solution, so 10k resamples take milliseconds.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(x), size=(n_resamples, len(x)))
+    x_samples, y_samples = x[idx], y[idx]
 
-# Create simplified categories for pie chart
-clean_df['Other Financial Assets_pct'] = clean_df[[
-    'Debt securities_pct', 
-    'Loans_pct', 
-    'Financial derivatives and employee stock options_pct', 
-    'Other accounts receivable/\npayable_pct'
-]].sum(axis=1)
+    x_centered = x_samples - x_samples.mean(axis=1, keepdims=True)
+    y_centered = y_samples - y_samples.mean(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Resamples that repeat a single x value have no slope and are ignored
+        slopes = (x_centered * y_centered).sum(axis=1) / (x_centered ** 2).sum(axis=1)
+    intercepts = y_samples.mean(axis=1) - slopes * x_samples.mean(axis=1)
 
-# Convert Insurance ratio to percentage
-clean_df['Ins on FA'] = clean_df['Ins on FA'] / 100
+    band_x = np.linspace(x.min(), x.max(), n_points)
+    predictions = slopes[:, None] * band_x + intercepts[:, None]
+    alpha = (1 - ci) / 2
+    lower, upper = np.nanquantile(predictions, [alpha, 1 - alpha], axis=0)
+    return band_x, lower, upper
 
-# Get ISO codes for flags
-clean_df['ISO'] = coco.convert(names=clean_df['Country'].tolist(), to='ISO2')
-clean_df.loc[clean_df['Country'] == 'EU', 'ISO'] = 'EU'
+def add_trend_band(x, y, color, legendgroup):
+    """Add a shaded bootstrap band that toggles together with its trend line."""
+    band_x, lower, upper = bootstrap_trend_band(x, y)
+    fig.add_trace(go.Scatter(
+        x=np.concatenate([band_x, band_x[::-1]]),
+        y=np.concatenate([upper, lower[::-1]]),
+        fill='toself',
+        fillcolor=color,
+        opacity=0.15,
+        line=dict(width=0),
+        hoverinfo='skip',
+        legendgroup=legendgroup,
+        showlegend=False
+    ))
 
-# Create flag emoji Unicode strings
-clean_df['flag'] = clean_df['ISO'].apply(lambda x: '🇪🇺' if x == 'EU' else 
-    ''.join(chr(ord(c) + 127397) for c in x))
+# Read the data
+clean_df = load_dataset().copy()
 
 # Calculate bubble sizes
 max_bubble_size = 60
@@ -166,11 +128,14 @@ def add_country_trace(data, color, name):
     # Add trend line for this group
     if len(data) > 1:  # Only add trend line if we have more than one point
         line_x, line_y, r_squared = calculate_trendline(data['AIC per person'], data['Ins on FA'])
+        if SHOW_TREND_BANDS and len(data) > 2:
+            add_trend_band(data['AIC per person'], data['Ins on FA'], color, f'{name} trend')
         fig.add_trace(go.Scatter(
             x=line_x,
             y=line_y,
             mode='lines',
             name=f'{name} trend (R² = {r_squared:.2f})',
+            legendgroup=f'{name} trend',
             line=dict(
                 color=color,
                 dash='dot',
@@ -201,11 +166,14 @@ add_country_trace(other_countries, '#D3D3D3', 'Other Countries')  # Light grey f
 # Add overall trend line for all visible points
 all_data = pd.concat([italy_data, top_17_data, other_countries])
 line_x, line_y, r_squared = calculate_trendline(all_data['AIC per person'], all_data['Ins on FA'])
+if SHOW_TREND_BANDS:
+    add_trend_band(all_data['AIC per person'], all_data['Ins on FA'], 'black', 'Overall trend')
 fig.add_trace(go.Scatter(
     x=line_x,
     y=line_y,
     mode='lines',
     name=f'Overall trend (R² = {r_squared:.2f})',
+    legendgroup='Overall trend',
     line=dict(
         color='black',
         dash='dot',
@@ -0,0 +1,135 @@
+import os
+import pandas as pd
+import numpy as np
+import country_converter as coco
+
+DATA_PATH = 'Fonti per post linkedin liquidità/Master Dati Eurostat.csv'
+
+# Column name -> position in the Master CSV
+COLUMNS = {
+    'Legend': 0,  # Column A
+    'Country': 1,  # Column B
+    'Currency and deposits': 2,  # Column C
+    'Debt securities': 3,  # Column D
+    'Loans': 4,  # Column E
+    'Equity and investment fund shares': 5,  # Column F
+    'Insurance, pensions and standardised guarantees': 6,  # Column G
+    'Financial derivatives and employee stock options': 7,  # Column H
+    'Other accounts receivable/\npayable': 8,  # Column I
+    'GDP 2023 Billion Euro': 9,  # Column J
+    'AIC 2023': 10,  # Column K
+    'pop M': 16,  # Column Q
+    'AIC per person': 17,  # Column R
+    'Ins on FA': 14,  # Column O
+}
+
+FINANCIAL_COLUMNS = [
+    'Currency and deposits',
+    'Equity and investment fund shares',
+    'Insurance, pensions and standardised guarantees',
+    'Debt securities',
+    'Loans',
+    'Financial derivatives and employee stock options',
+    'Other accounts receivable/\npayable'
+]
+
+# Simplified asset-mix shares shown in the bubble chart hover text
+ASSET_MIX_COLUMNS = [
+    'Currency and deposits_pct',
+    'Equity and investment fund shares_pct',
+    'Insurance, pensions and standardised guarantees_pct',
+    'Other Financial Assets_pct'
+]
+
+# Parsed datasets keyed by path, each with the file mtime it was built from
+_cache = {}
+
+
+def convert_european_number(x):
+    if pd.isna(x):
+        return np.nan
+    try:
+        # Remove any leading/trailing whitespace and tabs
+        x = str(x).strip().replace('\t', '')
+        # Remove % sign if present
+        x = x.rstrip('%')
+        # Replace comma with dot for decimal point
+        x = x.replace('.', '').replace(',', '.')
+        return float(x)
+    except:
+        return np.nan
+
+
+def read_clean_data(path=DATA_PATH):
+    """Read the Master CSV and return one cleaned row per country (EU aggregate excluded)."""
+    df = pd.read_csv(path,
+                     skiprows=1,  # Skip only the first row to get proper column alignment
+                     sep=';',
+                     na_values=[':'])
+
+    # Clean up the data - include all countries except the EU row (which is at the end)
+    df = df[df['Country'].notna() & (df['Country'] != 'EU')]
+
+    # Create clean DataFrame with converted values
+    clean_df = pd.DataFrame()
+    for col_name, col_idx in COLUMNS.items():
+        if col_name in ['Legend', 'Country']:
+            clean_df[col_name] = df.iloc[:, col_idx].str.strip()
+        else:
+            clean_df[col_name] = df.iloc[:, col_idx].apply(convert_european_number)
+
+    # Calculate total financial assets
+    clean_df['Total Financial Assets'] = clean_df[FINANCIAL_COLUMNS].sum(axis=1)
+
+    # Calculate percentages for each financial asset type
+    for col in FINANCIAL_COLUMNS:
+        clean_df[f'{col}_pct'] = clean_df[col] / clean_df['Total Financial Assets'] * 100
+
+    # Create simplified categories for pie chart
+    clean_df['Other Financial Assets_pct'] = clean_df[[
+        'Debt securities_pct',
+        'Loans_pct',
+        'Financial derivatives and employee stock options_pct',
+        'Other accounts receivable/\npayable_pct'
+    ]].sum(axis=1)
+
+    # Convert Insurance ratio to percentage
+    clean_df['Ins on FA'] = clean_df['Ins on FA'] / 100
+
+    # Get ISO codes for flags
+    clean_df['ISO'] = coco.convert(names=clean_df['Country'].tolist(), to='ISO2')
+    clean_df.loc[clean_df['Country'] == 'EU', 'ISO'] = 'EU'
+
+    # Create flag emoji Unicode strings
+    clean_df['flag'] = clean_df['ISO'].apply(lambda x: '🇪🇺' if x == 'EU' else
+        ''.join(chr(ord(c) + 127397) for c in x))
+
+    return clean_df.reset_index(drop=True)
+
+
+def load_dataset(path=DATA_PATH):
+    """Return the cleaned dataset, re-parsing the CSV only when its mtime changes.
+
+    The returned DataFrame is shared between callers, copy it before adding columns.
+    """
+    mtime = os.path.getmtime(path)
+    entry = _cache.get(path)
+    if entry is None or entry['mtime'] != mtime:
+        entry = {'mtime': mtime, 'data': read_clean_data(path), 'artifacts': {}}
+        _cache[path] = entry
+    return entry['data']
+
+
+def get_artifact(name, builder, path=DATA_PATH):
+    """Return a result derived from the dataset, built once and dropped with it.
+
+    Args:
+        name (str): Cache key for the derived result
+        builder (callable): Called with the cleaned DataFrame on a cache miss
+        path (str): Dataset the result is derived from
+    """
+    load_dataset(path)
+    artifacts = _cache[path]['artifacts']
+    if name not in artifacts:
+        artifacts[name] = builder(_cache[path]['data'])
+    return artifacts[name]
@@ -1,8 +1,36 @@
 from pytrends.request import TrendReq
 import pandas as pd
 from datetime import datetime, timedelta
+import os
+import sys
 import time
-import random
+
+# Share the backend's rate limiter so downloads and the API respect one budget
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Sources', 'google trends', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+from services.rate_limiter import RateLimiter, BATCH
+
+# The bucket lives in the backend's database, so this process and the API draw
+# on one budget; batch downloads wait while the API has requests queued.
+# Without DATABASE_URL, use the backend's default database wherever this runs from
+limiter = RateLimiter(database_url=os.environ.get(
+    'DATABASE_URL', 'sqlite:///' + os.path.abspath(os.path.join(BACKEND_DIR, 'trends.db'))
+))
+
+def wait_before_retry(attempt):
+    """
+    Back off before retrying a failed request, in steps of the shared rate limit
+    
+    Waits 2**attempt request intervals of the limiter, so a retry after an
+    error (often a 429) slows down with the budget instead of at random. The
+    retried request still takes its slot through limiter.acquire(BATCH).
+    
+    Args:
+        attempt (int): Zero-based number of the attempt that failed
+    """
+    wait_time = 2 ** attempt / limiter.rate
+    print(f"Waiting {wait_time:.2f} seconds before retrying...")
+    time.sleep(wait_time)
 
 def download_google_trends_data(keywords, timeframe='today 3-m', geo='IT', max_retries=3):
     """
@@ -31,9 +59,11 @@ def download_google_trends_data(keywords, timeframe='today 3-m', geo='IT', max_r
     for attempt in range(max_retries):
         try:
             # Build payload
+            limiter.acquire(BATCH)
             pytrends.build_payload(keywords, timeframe=timeframe, geo=geo)
             
             # Get interest over time
+            limiter.acquire(BATCH)
             interest_over_time_df = pytrends.interest_over_time()
             if interest_over_time_df is not None and not interest_over_time_df.empty:
                 results['interest_over_time'] = interest_over_time_df
@@ -41,9 +71,7 @@ def download_google_trends_data(keywords, timeframe='today 3-m', geo='IT', max_r
         except Exception as e:
             print(f"Attempt {attempt + 1} failed: {str(e)}")
             if attempt < max_retries - 1:
-                wait_time = random.uniform(5, 10)  # Random wait between 5-10 seconds
-                print(f"Waiting {wait_time:.2f} seconds before retrying...")
-                time.sleep(wait_time)
+                wait_before_retry(attempt)
             else:
                 print("Max retries reached for interest over time data")
     
@@ -55,7 +83,7 @@ def download_google_trends_data(keywords, timeframe='today 3-m', geo='IT', max_r
         # Try to get related queries with retries
         for attempt in range(max_retries):
             try:
-                time.sleep(random.uniform(2, 4))  # Random wait between 2-4 seconds
+                limiter.acquire(BATCH)
                 queries = pytrends.related_queries()
                 if keyword in queries and queries[keyword] is not None:
                     results['related_queries'][keyword] = queries[keyword]
@@ -63,14 +91,12 @@ def download_google_trends_data(keywords, timeframe='today 3-m', geo='IT', max_r
             except Exception as e:
                 print(f"Attempt {attempt + 1} failed for {keyword} queries: {str(e)}")
                 if attempt < max_retries - 1:
-                    wait_time = random.uniform(5, 10)
-                    print(f"Waiting {wait_time:.2f} seconds before retrying...")
-                    time.sleep(wait_time)
+                    wait_before_retry(attempt)
         
         # Try to get related topics with retries
         for attempt in range(max_retries):
             try:
-                time.sleep(random.uniform(2, 4))  # Random wait between 2-4 seconds
+                limiter.acquire(BATCH)
                 topics = pytrends.related_topics()
                 if keyword in topics and topics[keyword] is not None:
                     results['related_topics'][keyword] = topics[keyword]
@@ -78,9 +104,7 @@ def download_google_trends_data(keywords, timeframe='today 3-m', geo='IT', max_r
             except Exception as e:
                 print(f"Attempt {attempt + 1} failed for {keyword} topics: {str(e)}")
                 if attempt < max_retries - 1:
-                    wait_time = random.uniform(5, 10)
-                    print(f"Waiting {wait_time:.2f} seconds before retrying...")
-                    time.sleep(wait_time)
+                    wait_before_retry(attempt)
     
     return results
 
@@ -0,0 +1,169 @@
+import pandas as pd
+import plotly.graph_objects as go
+import numpy as np
+import os
+from scipy import stats
+from eurostat_data import load_dataset, COLUMNS
+
+# Numeric indicators available in the cleaned dataset
+INDICATORS = [col for col in COLUMNS if col not in ['Legend', 'Country']] + [
+    'Total Financial Assets',
+    'Currency and deposits_pct',
+    'Equity and investment fund shares_pct',
+    'Insurance, pensions and standardised guarantees_pct',
+    'Other Financial Assets_pct'
+]
+
+GROUP_COLORS = {
+    'Italy': '#008C45',
+    'Top 17': '#1f77b4',
+    'Other': '#D3D3D3'
+}
+
+# Number of indicators shown in the scatter matrix
+SPLOM_SIZE = 6
+
+
+def pairwise_regressions(df, indicators=INDICATORS, group_col='Legend'):
+    """Fit y = slope * x + intercept for every indicator pair and every country group.
+
+    All sums are built in one einsum over the (countries x indicators) matrix, so the
+    cost does not grow with the number of pairs in Python. Missing values are dropped
+    pairwise. The 'All' group covers every country.
+
+    Returns:
+        pd.DataFrame: one row per (group, x, y) with n, slope, intercept, r_squared, p_value
+    """
+    values = df[indicators].to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    values = np.where(valid, values, 0.0)
+    valid = valid.astype(float)
+
+    groups = ['All'] + list(df[group_col].dropna().unique())
+    membership = np.array([np.ones(len(df))] + [(df[group_col] == g).to_numpy(dtype=float) for g in groups[1:]])
+
+    # Sums over countries where both x (axis i) and y (axis j) are present
+    n = np.einsum('gk,ki,kj->gij', membership, valid, valid)
+    sx = np.einsum('gk,ki,kj->gij', membership, values, valid)
+    sy = np.einsum('gk,ki,kj->gij', membership, valid, values)
+    sxx = np.einsum('gk,ki,kj->gij', membership, values ** 2, valid)
+    syy = np.einsum('gk,ki,kj->gij', membership, valid, values ** 2)
+    sxy = np.einsum('gk,ki,kj->gij', membership, values, values)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = n * sxy - sx * sy
+        var_x = n * sxx - sx ** 2
+        var_y = n * syy - sy ** 2
+        slope = cov / var_x
+        intercept = (sy - slope * sx) / n
+        r = np.clip(cov / np.sqrt(var_x * var_y), -1, 1)
+        dof = n - 2
+        t_stat = r * np.sqrt(dof / (1 - r ** 2))
+        p_value = np.where(dof > 0, 2 * stats.t.sf(np.abs(t_stat), np.maximum(dof, 1)), np.nan)
+
+    g_idx, x_idx, y_idx = np.nonzero(~np.eye(len(indicators), dtype=bool)[None].repeat(len(groups), axis=0))
+    return pd.DataFrame({
+        'group': np.array(groups)[g_idx],
+        'x': np.array(indicators)[x_idx],
+        'y': np.array(indicators)[y_idx],
+        'n': n[g_idx, x_idx, y_idx].astype(int),
+        'slope': slope[g_idx, x_idx, y_idx],
+        'intercept': intercept[g_idx, x_idx, y_idx],
+        'r_squared': r[g_idx, x_idx, y_idx] ** 2,
+        'p_value': p_value[g_idx, x_idx, y_idx]
+    })
+
+
+def strongest_indicators(regressions, count=SPLOM_SIZE):
+    """Pick the indicators involved in the strongest relationships across all countries."""
+    overall = regressions[regressions['group'] == 'All'].sort_values('r_squared', ascending=False)
+    selected = []
+    for _, row in overall.iterrows():
+        for indicator in (row['x'], row['y']):
+            if indicator not in selected:
+                selected.append(indicator)
+        if len(selected) >= count:
+            break
+    return selected[:count]
+
+
+def create_scatter_matrix(df, regressions, indicators, group_col='Legend'):
+    """Create an interactive scatter matrix with a trendline per group in every panel."""
+    fig = go.Figure()
+    labels = [ind.replace('\n', '') for ind in indicators]
+
+    for group, color in GROUP_COLORS.items():
+        data = df[df[group_col] == group]
+        fig.add_trace(go.Splom(
+            dimensions=[dict(label=label, values=data[ind]) for label, ind in zip(labels, indicators)],
+            name=group,
+            text=data['Country'],
+            hovertemplate='%{text}<extra></extra>',
+            marker=dict(color=color, size=8, line=dict(color='white', width=0.5)),
+            diagonal_visible=False,
+            showupperhalf=False
+        ))
+
+    # Index the fits once so each panel is a lookup instead of a filter
+    fits = regressions.set_index(['group', 'x', 'y'])
+    for i, x_col in enumerate(indicators):
+        for j, y_col in enumerate(indicators):
+            # Only the lower half of the matrix is drawn
+            if j <= i:
+                continue
+            x_values = df[x_col].dropna()
+            line_x = np.array([x_values.min(), x_values.max()])
+            for group, color in list(GROUP_COLORS.items()) + [('All', 'black')]:
+                fit = fits.loc[(group, x_col, y_col)]
+                if fit['n'] < 3 or np.isnan(fit['slope']):
+                    continue
+                fig.add_trace(go.Scatter(
+                    x=line_x,
+                    y=fit['slope'] * line_x + fit['intercept'],
+                    mode='lines',
+                    xaxis='x' if i == 0 else f'x{i + 1}',
+                    yaxis='y' if j == 0 else f'y{j + 1}',
+                    line=dict(color=color, dash='dot', width=1),
+                    hovertext=f"{group}: R² = {fit['r_squared']:.2f}, p = {fit['p_value']:.3f}",
+                    hoverinfo='text',
+                    showlegend=False
+                ))
+
+    fig.update_layout(
+        title=dict(
+            text='European Household Indicators - Scatter Matrix 2023',
+            x=0.5,
+            font=dict(size=24)
+        ),
+        template='plotly_white',
+        hovermode='closest',
+        dragmode='select',
+        width=1400,
+        height=1400,
+        font=dict(size=10)
+    )
+
+    return fig
+
+
+def main():
+    clean_df = load_dataset()
+    regressions = pairwise_regressions(clean_df)
+
+    print("Strongest relationships across all countries:")
+    top = regressions[regressions['group'] == 'All'].sort_values('r_squared', ascending=False)
+    # Each pair appears twice (x vs y and y vs x), keep one
+    top = top[top['x'] < top['y']].head(10)
+    for _, row in top.iterrows():
+        print(f"  {row['y']!r} vs {row['x']!r}: R² = {row['r_squared']:.2f}, p = {row['p_value']:.4f}")
+
+    fig = create_scatter_matrix(clean_df, regressions, strongest_indicators(regressions))
+
+    os.makedirs("HTML outputs", exist_ok=True)
+    regressions.to_csv("HTML outputs/indicator_regressions.csv", index=False)
+    fig.write_html("HTML outputs/indicator_explorer.html")
+    print("Scatter matrix has been saved to 'HTML outputs/indicator_explorer.html'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import pandas as pd
+import numpy as np
+from scipy.spatial import cKDTree
+from eurostat_data import get_artifact, ASSET_MIX_COLUMNS, DATA_PATH
+
+DEFAULT_CLUSTERS = 4
+
+
+def kmeans(points, n_clusters, n_init=10, max_iter=100, tol=1e-8, seed=42):
+    """Cluster points with k-means, running every restart at once.
+
+    All n_init restarts are stacked into one (n_init, n_clusters, n_features)
+    array, so each iteration is a single broadcasted distance computation
+    whatever the number of points or restarts. Restarts use k-means++ seeding.
+
+    Returns:
+        tuple: (labels, centroids, inertia) of the best restart
+    """
+    points = np.asarray(points, dtype=float)
+    n_points = len(points)
+    n_clusters = min(n_clusters, n_points)
+    rng = np.random.default_rng(seed)
+    runs = np.arange(n_init)
+
+    # k-means++ seeding for all restarts together
+    centroids = np.empty((n_init, n_clusters, points.shape[1]))
+    centroids[:, 0] = points[rng.integers(0, n_points, n_init)]
+    closest = ((points[None] - centroids[:, :1]) ** 2).sum(axis=2)
+    for c in range(1, n_clusters):
+        probs = closest / np.maximum(closest.sum(axis=1, keepdims=True), 1e-300)
+        picks = (probs.cumsum(axis=1) < rng.random((n_init, 1))).sum(axis=1)
+        centroids[:, c] = points[np.minimum(picks, n_points - 1)]
+        closest = np.minimum(closest, ((points[None] - centroids[:, c:c + 1]) ** 2).sum(axis=2))
+
+    for _ in range(max_iter):
+        distances = ((points[None, :, None] - centroids[:, None]) ** 2).sum(axis=3)
+        labels = distances.argmin(axis=2)
+
+        # Per-cluster sums via one bincount over (restart, cluster) slots
+        slots = (runs[:, None] * n_clusters + labels).ravel()
+        counts = np.bincount(slots, minlength=n_init * n_clusters).reshape(n_init, n_clusters)
+        sums = np.stack([
+            np.bincount(slots, weights=np.tile(points[:, f], n_init), minlength=n_init * n_clusters)
+            for f in range(points.shape[1])
+        ], axis=1).reshape(n_init, n_clusters, -1)
+
+        # Empty clusters keep their previous centroid
+        new_centroids = np.where(counts[:, :, None] > 0, sums / np.maximum(counts, 1)[:, :, None], centroids)
+        shift = ((new_centroids - centroids) ** 2).sum()
+        centroids = new_centroids
+        if shift <= tol:
+            break
+
+    distances = ((points[None, :, None] - centroids[:, None]) ** 2).sum(axis=3)
+    labels = distances.argmin(axis=2)
+    inertia = np.take_along_axis(distances, labels[:, :, None], axis=2).sum(axis=(1, 2))
+    best = inertia.argmin()
+    return labels[best], centroids[best], inertia[best]
+
+
+class PortfolioPeers:
+    """Clusters of countries (or regions) by asset-mix composition, with peer search.
+
+    Works on any DataFrame with one row per unit and the asset-mix share
+    columns, so the same code serves 25 countries or a few hundred NUTS-2 regions.
+    """
+
+    def __init__(self, df, n_clusters=DEFAULT_CLUSTERS, columns=ASSET_MIX_COLUMNS, name_col='Country'):
+        data = df.dropna(subset=columns)
+        self.columns = list(columns)
+        self.names = data[name_col].tolist()
+        self._positions = {name: i for i, name in enumerate(self.names)}
+        self.points = data[self.columns].to_numpy(dtype=float)
+
+        self.labels, self.centroids, self.inertia = kmeans(self.points, n_clusters)
+        self.tree = cKDTree(self.points)
+
+    def clusters(self):
+        """Return a DataFrame with the cluster of every unit."""
+        return pd.DataFrame({'name': self.names, 'cluster': self.labels})
+
+    def nearest_peers(self, name, k=5):
+        """Return the k units whose asset mix is closest to the given one."""
+        i = self._positions[name]
+        # Ask for one extra neighbour, the closest match is the unit itself
+        distances, indices = self.tree.query(self.points[i], k=min(k + 1, len(self.names)))
+        keep = indices != i
+        indices, distances = indices[keep][:k], distances[keep][:k]
+        return pd.DataFrame({
+            'name': [self.names[j] for j in indices],
+            'distance': distances,
+            'cluster': self.labels[indices],
+            'same_cluster': self.labels[indices] == self.labels[i]
+        })
+
+
+def get_portfolio_peers(n_clusters=DEFAULT_CLUSTERS, path=DATA_PATH):
+    """Return the PortfolioPeers for the dataset, cached until the CSV changes."""
+    return get_artifact(
+        f'portfolio_peers_{n_clusters}',
+        lambda df: PortfolioPeers(df, n_clusters=n_clusters),
+        path
+    )
+
+
+def main():
+    peers = get_portfolio_peers()
+
+    print("Countries by asset-mix cluster:")
+    clusters = peers.clusters()
+    for cluster, members in clusters.groupby('cluster'):
+        centroid = ', '.join(f"{col.replace('_pct', '')}: {value:.1f}%"
+                             for col, value in zip(peers.columns, peers.centroids[cluster]))
+        print(f"  Cluster {cluster} ({centroid})")
+        print(f"    {', '.join(members['name'])}")
+
+    print("\nMost similar peers to Italy:")
+    for _, row in peers.nearest_peers('Italy').iterrows():
+        print(f"  {row['name']}: distance {row['distance']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,87 @@
-from flask import Blueprint, jsonify, request
-from services.trends_service import TrendsService
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.local import LocalProxy
 from services.content_generator import ContentGenerator
 
 # Create blueprint
 content_bp = Blueprint('content', __name__)
 
-# Initialize services
-trends_service = TrendsService()
+# Initialize services, the trends service is the one init_trends_service attached to the app
+trends_service = LocalProxy(lambda: current_app.extensions['trends_service'])
 content_generator = ContentGenerator()
 
+def clean_topics(topics):
+    """Strip the topics and drop anything that is not a non-empty string, and repeats."""
+    if not isinstance(topics, list):
+        return []
+    return list(dict.fromkeys(
+        topic.strip() for topic in topics if isinstance(topic, str) and topic.strip()
+    ))
+
+def get_topic_details(topic, region=''):
+    """
+    Look up the current interest of a topic, empty if trend data is unavailable.
+    
+    Takes the last point of the topic's own 'today 3-m' search, which is what
+    /suggestions has always reported; the bulk suggestions use it too, so a
+    topic gets the same numbers through either endpoint and both share the
+    cached search.
+    """
+    try:
+        search_results = trends_service.search_trends(
+            keywords=[topic],
+            geo=region
+        )
+        
+        interest_data = search_results.get('interest_over_time')
+        if interest_data:
+            current_interest = interest_data[-1].get(topic, 0)
+            return {
+                'current_interest': current_interest,
+                'rising': current_interest > 50  # Arbitrary threshold
+            }
+    except Exception as e:
+        # Continue with basic trend data if analytics fails
+        print(f"Error enriching trend data: {e}")
+    return {}
+
+def suggest_for_topics(topics, region, count_per_topic):
+    """
+    Generate enriched suggestions for several topics at once.
+    
+    The topics are looked up side by side within the trends client pool,
+    and each topic's suggestions are generated as soon as its lookup
+    returns. The shared rate limiter still paces the upstream calls.
+    
+    Args:
+        topics (list): Topics to generate suggestions for, see clean_topics
+        region (str): Region code for the trend data
+        count_per_topic (int): Suggestions per topic
+        
+    Returns:
+        list: Suggestions, grouped by topic in the order given
+    """
+    if not topics:
+        return []
+    app = current_app._get_current_object()
+    
+    def lookup(topic):
+        # The workers need the app to find the trends service
+        with app.app_context():
+            return get_topic_details(topic, region)
+            
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(len(topics), trends_service.pool.size)) as executor:
+        futures = {
+            executor.submit(lookup, topic): topic
+            for topic in topics
+        }
+        for future in as_completed(futures):
+            topic = futures[future]
+            trend_data = {'topic': topic, 'details': future.result()}
+            results[topic] = content_generator.generate_enriched_post_ideas(trend_data, count=count_per_topic)
+    return [suggestion for topic in topics for suggestion in results.get(topic, [])]
+
 @content_bp.route('/suggestions', methods=['POST'])
 def generate_content_suggestions():
     """Generate content suggestions based on trend data."""
@@ -28,53 +101,25 @@ def generate_content_suggestions():
         count = int(data.get('count', 3))
         
         # Validate parameters
-        if not topic:
+        if not isinstance(topic, str) or not topic.strip():
             return jsonify({
                 'status': 'error',
                 'message': 'Topic parameter is required'
             }), 400
+        topic = topic.strip()
             
         # Limit count to a reasonable number
         if count > 10:
             count = 10
             
-        # Get trend data for the topic
+        # Get trend data for the topic, enriched with real trend data if available
         trend_data = {
             'topic': topic,
-            'details': {}
+            'details': get_topic_details(topic, region)
         }
         
-        # Try to enrich with real trend data if available
-        try:
-            search_results = trends_service.search_trends(
-                keywords=[topic],
-                geo=region
-            )
-            
-            if search_results.get('interest_over_time'):
-                # Extract analytics data
-                interest_data = search_results['interest_over_time']
-                if interest_data:
-                    current_interest = interest_data[-1].get(topic, 0)
-                    trend_data['details'] = {
-                        'current_interest': current_interest,
-                        'rising': current_interest > 50  # Arbitrary threshold
-                    }
-        except Exception as e:
-            # Continue with basic trend data if analytics fails
-            print(f"Error enriching trend data: {e}")
-            
-        # Generate content suggestions
-        suggestions = content_generator.generate_post_ideas(trend_data, count=count)
-        
-        # Enrich suggestions with analytics if available
-        enriched_suggestions = []
-        for suggestion in suggestions:
-            enriched_suggestion = content_generator.enrich_post_with_analytics(
-                suggestion,
-                trend_data['details']
-            )
-            enriched_suggestions.append(enriched_suggestion)
+        # Generate content suggestions enriched with analytics
+        enriched_suggestions = content_generator.generate_enriched_post_ideas(trend_data, count=count)
             
         return jsonify({
             'status': 'success',
@@ -100,7 +145,7 @@ def generate_bulk_content_suggestions():
             }), 400
             
         # Get parameters
-        topics = data.get('topics', [])
+        topics = clean_topics(data.get('topics', []))
         region = data.get('region', '')
         count_per_topic = int(data.get('count_per_topic', 1))
         
@@ -118,19 +163,8 @@ def generate_bulk_content_suggestions():
         # Limit number of topics to process
         topics = topics[:10]
         
-        # Process each topic
-        all_suggestions = []
-        
-        for topic in topics:
-            # Create trend data
-            trend_data = {
-                'topic': topic,
-                'details': {}
-            }
-            
-            # Generate suggestions
-            suggestions = content_generator.generate_post_ideas(trend_data, count=count_per_topic)
-            all_suggestions.extend(suggestions)
+        # Fetch trend data for all topics concurrently
+        all_suggestions = suggest_for_topics(topics, region, count_per_topic)
             
         return jsonify({
             'status': 'success',
@@ -164,11 +198,13 @@ def generate_trending_content_suggestions():
         # Limit to requested number of trends
         trends = trends[:count]
         
-        # Generate content suggestions for each trend
-        all_suggestions = content_generator.generate_content_from_trends(
-            trends,
-            count_per_trend=count_per_trend
-        )
+        # Generate content suggestions for each trend, enriched with the
+        # details fetched along with the trending list
+        all_suggestions = [
+            suggestion
+            for trend in trends
+            for suggestion in content_generator.generate_enriched_post_ideas(trend, count=count_per_trend)
+        ]
             
         return jsonify({
             'status': 'success',
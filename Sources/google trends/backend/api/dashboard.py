@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.local import LocalProxy
+from services.trends_service import MAX_KEYWORDS_PER_PAYLOAD
+from services.content_generator import ContentGenerator
+
+# Create blueprint
+dashboard_bp = Blueprint('dashboard', __name__)
+
+# Initialize services, the trends service is the one init_trends_service attached to the app
+trends_service = LocalProxy(lambda: current_app.extensions['trends_service'])
+content_generator = ContentGenerator()
+
+@dashboard_bp.route('', methods=['GET'])
+def get_dashboard():
+    """
+    Get everything the dashboard shows in one response.
+
+    The trending list is fetched once and shared: the regional distribution
+    of its top topics is fetched while the content suggestions are generated.
+    """
+    try:
+        # Get query parameters
+        geo = request.args.get('geo', '')
+        category = int(request.args.get('category', 0))
+        count = min(int(request.args.get('count', 10)), 10)
+        suggestion_count = min(int(request.args.get('suggestions', 5)), 10)
+        count_per_trend = min(int(request.args.get('count_per_trend', 1)), 3)
+        resolution = request.args.get('resolution', 'COUNTRY')
+
+        # Get current trending topics, once for the whole dashboard
+        trends = trends_service.get_current_trends(geo=geo, category=category)[:count]
+        top_topics = [trend['topic'] for trend in trends[:MAX_KEYWORDS_PER_PAYLOAD]]
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Regional distribution of the top topics, one upstream payload
+            geo_future = executor.submit(
+                trends_service.get_geo_distribution, top_topics, geo, category, resolution
+            )
+
+            # Content suggestions, enriched with the details of each trend
+            suggestions = [
+                suggestion
+                for trend in trends[:suggestion_count]
+                for suggestion in content_generator.generate_enriched_post_ideas(trend, count=count_per_trend)
+            ]
+
+            geo_distribution = geo_future.result()
+
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'geo': geo,
+                'trends': trends,
+                'suggestions': suggestions,
+                'regional': {
+                    'topics': top_topics,
+                    'resolution': resolution,
+                    'geo_distribution': geo_distribution
+                },
+                'degraded': trends_service.degraded
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
@@ -1,13 +1,54 @@
-from flask import Blueprint, jsonify, request
-from services.trends_service import TrendsService
+from flask import Blueprint, current_app, Response, jsonify, request, stream_with_context
+from werkzeug.local import LocalProxy
+from services.trend_stream import get_trend_stream
+from utils.response_format import format_search_results
+from utils.downsample import downsample_rows, MIN_POINTS
+from utils.http_cache import etag_from_data, no_http_cache
 
 # Create blueprint
 trends_bp = Blueprint('trends', __name__)
 
-# Initialize services
-trends_service = TrendsService()
+# Initialize services, the trends service is the one init_trends_service attached to the app
+trends_service = LocalProxy(lambda: current_app.extensions['trends_service'])
+
+
+def invalid_max_points():
+    """Return a 400 response if ?max_points is given but not a number of at least MIN_POINTS, else None."""
+    value = request.args.get('max_points')
+    if value is None:
+        return None
+    try:
+        if int(value) >= MIN_POINTS:
+            return None
+    except ValueError:
+        pass
+    return jsonify({
+        'status': 'error',
+        'message': f'max_points must be an integer of at least {MIN_POINTS}'
+    }), 400
+
+
+def search_response(results):
+    """
+    Return search results in the row or columnar format the client negotiated,
+    downsampled to ?max_points rows when given.
+    """
+    max_points = request.args.get('max_points', type=int)
+    if max_points is not None and results.get('interest_over_time'):
+        results = dict(results)
+        results['interest_over_time'] = downsample_rows(results['interest_over_time'], max_points)
+    data, mimetype = format_search_results(results)
+    response = jsonify({
+        'status': 'success',
+        'data': data
+    })
+    response.mimetype = mimetype
+    response.vary.add('Accept')
+    return response
+
 
 @trends_bp.route('/current', methods=['GET'])
+@etag_from_data
 def get_current_trends():
     """Get current trending topics."""
     try:
@@ -29,6 +70,7 @@ def get_current_trends():
         }), 500
 
 @trends_bp.route('/search', methods=['GET'])
+@etag_from_data
 def search_trends():
     """Search for specific keywords in Google Trends."""
     try:
@@ -44,6 +86,9 @@ def search_trends():
                 'status': 'error',
                 'message': 'Keywords parameter is required'
             }), 400
+        error = invalid_max_points()
+        if error is not None:
+            return error
             
         # Search trends
         results = trends_service.search_trends(
@@ -53,10 +98,7 @@ def search_trends():
             category=category
         )
         
-        return jsonify({
-            'status': 'success',
-            'data': results
-        })
+        return search_response(results)
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -64,6 +106,7 @@ def search_trends():
         }), 500
 
 @trends_bp.route('/geographic/<region>', methods=['GET'])
+@etag_from_data
 def get_regional_trends(region):
     """Get trends for a specific region."""
     try:
@@ -94,6 +137,7 @@ def get_regional_trends(region):
         }), 500
 
 @trends_bp.route('/history', methods=['GET'])
+@etag_from_data
 def get_historical_trends():
     """Get historical trend data."""
     try:
@@ -109,21 +153,80 @@ def get_historical_trends():
                 'status': 'error',
                 'message': 'Keywords parameter is required'
             }), 400
+        error = invalid_max_points()
+        if error is not None:
+            return error
             
-        # Search historical trends (reusing search_trends for now)
-        results = trends_service.search_trends(
+        # Weekly history comes from the local store, only missing weeks go upstream
+        results = trends_service.get_history(
             keywords=keywords,
             geo=geo,
             timeframe=timeframe,
             category=category
         )
         
-        return jsonify({
-            'status': 'success',
-            'data': results
-        })
+        return search_response(results)
     except Exception as e:
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500 
\ No newline at end of file
+        }), 500 
+
+@trends_bp.route('/scheduler', methods=['GET'])
+@no_http_cache
+def get_scheduler_status():
+    """Get the state of the background refresh scheduler."""
+    scheduler = trends_service.scheduler
+    if scheduler is None:
+        return jsonify({
+            'status': 'success',
+            'data': {'running': False}
+        })
+    return jsonify({
+        'status': 'success',
+        'data': scheduler.status()
+    })
+
+@trends_bp.route('/status', methods=['GET'])
+@no_http_cache
+def get_upstream_status():
+    """Get the health of the Google Trends connection, for showing degraded data."""
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'api_available': trends_service.api_available,
+            'degraded': trends_service.degraded,
+            'circuit': trends_service.breaker.status(),
+            'pool': trends_service.pool.stats(),
+            'rate_limiter': trends_service.limiter.stats(),
+            'stream': get_trend_stream(current_app.extensions['trends_service']).status()
+        }
+    })
+
+@trends_bp.route('/stream', methods=['GET'])
+def stream_trends():
+    """
+    Stream changes to the trending list, and optionally to a keyword series, as server-sent events.
+    
+    Clients get a 'snapshot' event per subject, then a 'diff' event each time
+    the data changes, and a 'status' event when the service becomes degraded
+    (no diffs until it recovers) or recovers.
+    """
+    geo = request.args.get('geo', '')
+    keywords = [k.strip() for k in request.args.get('keywords', '').split(',') if k.strip()]
+    
+    subjects = [('current', geo, ())]
+    if keywords:
+        subjects.append(('search', geo, tuple(dict.fromkeys(keywords))))
+        
+    stream = get_trend_stream(current_app.extensions['trends_service'])
+    subscription = stream.subscribe(subjects)
+    return Response(
+        stream_with_context(stream.events(subscription)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            # Stop proxies such as nginx from buffering the events
+            'X-Accel-Buffering': 'no'
+        }
+    )
@@ -1,5 +1,5 @@
 import os
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 
@@ -9,17 +9,28 @@ load_dotenv()
 # Import API blueprints
 from api.trends import trends_bp
 from api.content import content_bp
+from api.dashboard import dashboard_bp
+from utils.http_cache import init_http_cache
+from utils.metrics import init_metrics
+from services.trends_service import init_trends_service
+from services.scheduler_service import init_scheduler
 
 def create_app(test_config=None):
     # Create and configure the app
     app = Flask(__name__, instance_relative_config=True)
     
-    # Enable CORS
-    CORS(app)
+    # Enable CORS (the frontend reads the degraded flag header)
+    CORS(app, expose_headers=['X-Trends-Degraded'])
     
     app.config.from_mapping(
         SECRET_KEY=os.environ.get('SECRET_KEY', 'dev'),
         DATABASE_URL=os.environ.get('DATABASE_URL', 'sqlite:///trends.db'),
+        # Background refresh of watched keywords and regions [BE-07]
+        SCHEDULER_ENABLED=os.environ.get('SCHEDULER_ENABLED', '1') == '1',
+        SCHEDULER_INTERVAL=int(os.environ.get('SCHEDULER_INTERVAL', 3600)),
+        SCHEDULER_REQUESTS_PER_MINUTE=float(os.environ.get('SCHEDULER_REQUESTS_PER_MINUTE', 6)),
+        TRENDS_WATCHLIST=os.environ.get('TRENDS_WATCHLIST', ''),
+        TRENDS_WATCH_REGIONS=os.environ.get('TRENDS_WATCH_REGIONS', ''),
     )
 
     if test_config is None:
@@ -35,9 +46,31 @@ def create_app(test_config=None):
     except OSError:
         pass
 
+    # Shared trends service on the configured DATABASE_URL, used by the blueprints
+    trends_service = init_trends_service(app)
+
+    # Request latency and upstream metrics on /metrics (first, so it times the other hooks)
+    init_metrics(app)
+
+    # ETags, 304s and compressed bodies (after CORS so 304s keep CORS headers),
+    # unchanged trends results are revalidated without running the view
+    init_http_cache(app, data_version=trends_service.data_version)
+
+    # Serve stale results while refreshing them in the background
+    if app.config['SCHEDULER_ENABLED']:
+        init_scheduler(app, trends_service)
+
     # Register blueprints
     app.register_blueprint(trends_bp, url_prefix='/api/trends')
     app.register_blueprint(content_bp, url_prefix='/api/content')
+    app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+
+    @app.after_request
+    def mark_degraded(response):
+        # Tell clients the data may be mock or stale while Google is unavailable
+        if request.path.startswith('/api/') and trends_service.degraded:
+            response.headers['X-Trends-Degraded'] = '1'
+        return response
 
     @app.route('/')
     def index():
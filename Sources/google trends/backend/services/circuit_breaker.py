@@ -0,0 +1,147 @@
+import os
+import time
+import threading
+
+DEFAULT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 5))
+DEFAULT_RECOVERY_TIMEOUT = float(os.environ.get('CIRCUIT_RECOVERY_TIMEOUT', 60))
+DEFAULT_HALF_OPEN_CALLS = int(os.environ.get('CIRCUIT_HALF_OPEN_CALLS', 1))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Circuit breaker for an unreliable upstream dependency [BE-02]
+
+    Closed: calls go through, consecutive failures are counted.
+    Open: after failure_threshold consecutive failures, calls fail at once
+    with CircuitOpenError for recovery_timeout seconds.
+    Half-open: then up to half_open_max_calls trial calls go through; a
+    success closes the circuit, a failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name='upstream', failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 recovery_timeout=DEFAULT_RECOVERY_TIMEOUT, half_open_max_calls=DEFAULT_HALF_OPEN_CALLS,
+                 excluded=()):
+        """
+        Args:
+            name (str): Name shown in the status
+            failure_threshold (int): Consecutive failures that open the circuit
+            recovery_timeout (float): Seconds the circuit stays open before a trial call
+            half_open_max_calls (int): Trial calls allowed at once while half-open
+            excluded (tuple): Exception types raised before reaching upstream, which
+                say nothing about its health and are neither failures nor successes
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.excluded = tuple(excluded)
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self.stats = {'calls': 0, 'failures': 0, 'rejected': 0, 'opened': 0, 'last_error': None}
+
+    def _current_state(self):
+        # Caller holds the lock
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._trials = 0
+        return self._state
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _refused(self):
+        # Caller holds the lock, returns the state if a new call is refused
+        state = self._current_state()
+        if state == self.OPEN or (state == self.HALF_OPEN and self._trials >= self.half_open_max_calls):
+            self.stats['rejected'] += 1
+            return state
+        return None
+
+    def check(self):
+        """Raise CircuitOpenError if a call made now would be refused, without taking a trial call."""
+        with self._lock:
+            state = self._refused()
+        if state is not None:
+            raise CircuitOpenError(f"Circuit '{self.name}' is {state}")
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Call fn through the breaker.
+
+        While half-open, fn is the trial call for its whole run, so work it
+        does before reaching upstream (waiting for a rate limit token) is only
+        done by the callers that are let through.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all trial calls taken
+        """
+        with self._lock:
+            state = self._refused()
+            if state is not None:
+                raise CircuitOpenError(f"Circuit '{self.name}' is {state}")
+            state = self._current_state()
+            trial = state == self.HALF_OPEN
+            if trial:
+                self._trials += 1
+            self.stats['calls'] += 1
+
+        try:
+            result = fn(*args, **kwargs)
+        except self.excluded:
+            if trial:
+                # Let another caller make the trial call
+                with self._lock:
+                    self._trials = max(0, self._trials - 1)
+            raise
+        except Exception as e:
+            self._record_failure(trial, e)
+            raise
+        self._record_success(trial)
+        return result
+
+    def _record_success(self, trial):
+        with self._lock:
+            self._failures = 0
+            if trial or self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._trials = 0
+
+    def _record_failure(self, trial, error):
+        with self._lock:
+            self.stats['failures'] += 1
+            self.stats['last_error'] = f"{type(error).__name__}: {error}"
+            self._failures += 1
+            if trial or self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.stats['opened'] += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trials = 0
+
+    def status(self):
+        """Return the state, thresholds and counters of the breaker."""
+        with self._lock:
+            state = self._current_state()
+            retry_in = self.recovery_timeout - (time.monotonic() - self._opened_at) if state == self.OPEN else 0
+            return {
+                'name': self.name,
+                'state': state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'recovery_timeout': self.recovery_timeout,
+                'retry_in': round(max(0.0, retry_in), 3),
+                **self.stats
+            }
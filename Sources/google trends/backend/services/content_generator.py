@@ -106,6 +106,23 @@ class ContentGenerator:
             
         return all_ideas
     
+    def generate_enriched_post_ideas(self, trend_data, count=3):
+        """
+        Generate post ideas for a trend, enriched with the analytics in its details.
+        
+        Args:
+            trend_data (dict): Trend data with topic and optional details
+            count (int): Number of post ideas to generate
+            
+        Returns:
+            list: List of post ideas
+        """
+        details = (trend_data or {}).get('details') or {}
+        return [
+            self.enrich_post_with_analytics(post_idea, details)
+            for post_idea in self.generate_post_ideas(trend_data, count=count)
+        ]
+    
     def _normalize_topic(self, topic):
         """Convert a topic to a hashtag-friendly format."""
         # Remove special characters and spaces
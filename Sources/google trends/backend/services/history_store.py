@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import pandas as pd
+from services.trends_cache import DEFAULT_DATABASE_URL, sqlite_path
+
+# Seconds before the newest (still partial) week is fetched again
+HISTORY_TTL = 6 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS historical_data (
+    keyword TEXT NOT NULL,
+    geo TEXT NOT NULL,
+    date TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (keyword, geo, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS historical_coverage (
+    keyword TEXT NOT NULL,
+    geo TEXT NOT NULL,
+    complete_until TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    fetched_from TEXT,
+    PRIMARY KEY (keyword, geo)
+);
+CREATE TABLE IF NOT EXISTS historical_scales (
+    group_key TEXT NOT NULL,
+    geo TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    factor REAL NOT NULL,
+    PRIMARY KEY (group_key, geo, keyword)
+);
+"""
+
+
+def week_start(date):
+    """Return the Sunday starting the week of a date, as Google labels weekly points."""
+    date = pd.Timestamp(date).normalize()
+    return date - pd.Timedelta(days=(date.dayofweek + 1) % 7)
+
+
+def to_weekly(df):
+    """Average daily interest into Sunday-start weeks, weekly data is only re-labelled."""
+    if df.empty:
+        return df
+    weeks = pd.DatetimeIndex(df.index).normalize()
+    weeks = weeks - pd.to_timedelta((weeks.dayofweek + 1) % 7, unit='D')
+    return df.astype(float).groupby(weeks).mean()
+
+
+class HistoryStore:
+    """Local store of weekly interest series in the HistoricalDataTable [BE-08, DB-07]
+
+    Every keyword has its own stored scale: the scale of the payload it was
+    first fetched in. historical_scales records, for each group of keywords
+    fetched together, the factor from that payload's common scale to each
+    keyword's stored scale, so a group can be put back on one scale without
+    asking Google again.
+    """
+
+    def __init__(self, database_url=None):
+        """
+        Open (and create if needed) the history tables.
+
+        Args:
+            database_url (str): sqlite:/// URL, DATABASE_URL from the environment by default
+        """
+        self.database_url = database_url or os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+        # Bumped on every write, so callers can tell the stored data changed
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(sqlite_path(self.database_url), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(historical_coverage)")]
+            if 'fetched_from' not in columns:
+                # Stores created before fetched_from was recorded
+                self._conn.execute("ALTER TABLE historical_coverage ADD COLUMN fetched_from TEXT")
+
+    @staticmethod
+    def group_key(keywords):
+        return json.dumps(sorted(keywords), ensure_ascii=False)
+
+    def coverage(self, keywords, geo=''):
+        """
+        Return what is stored for each keyword.
+
+        Returns:
+            dict: keyword -> (first date, last complete week, fetched_at) for stored keywords.
+                The first date is the earliest start ever asked for, so a series
+                that Google only has from later on does not look incomplete.
+        """
+        result = {}
+        with self._lock:
+            for keyword in keywords:
+                row = self._conn.execute(
+                    "SELECT MIN(d.date), c.complete_until, c.fetched_at, c.fetched_from FROM historical_data d "
+                    "JOIN historical_coverage c ON c.keyword = d.keyword AND c.geo = d.geo "
+                    "WHERE d.keyword = ? AND d.geo = ?",
+                    (keyword, geo)
+                ).fetchone()
+                if row and row[0] is not None:
+                    first = min(row[0], row[3]) if row[3] else row[0]
+                    result[keyword] = (pd.Timestamp(first), pd.Timestamp(row[1]), row[2])
+        return result
+
+    def read(self, keywords, geo='', start=None, end=None):
+        """Return stored values between start and end, one column per keyword (NaN where missing)."""
+        start = pd.Timestamp(start).strftime('%Y-%m-%d') if start is not None else '0000-00-00'
+        end = pd.Timestamp(end).strftime('%Y-%m-%d') if end is not None else '9999-99-99'
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT keyword, date, value FROM historical_data WHERE geo = ? AND date BETWEEN ? AND ? "
+                f"AND keyword IN ({','.join('?' * len(keywords))})",
+                (geo, start, end, *keywords)
+            ).fetchall()
+        if not rows:
+            return pd.DataFrame(columns=keywords, dtype=float)
+        frame = pd.DataFrame(rows, columns=['keyword', 'date', 'value'])
+        frame = frame.pivot(index='date', columns='keyword', values='value')
+        frame.index = pd.DatetimeIndex(frame.index, name='date')
+        return frame.reindex(columns=keywords).astype(float)
+
+    def write(self, keyword, geo, series, complete_until, replace=False, fetched_from=None):
+        """
+        Upsert integer points for a keyword and record how far it is complete.
+
+        Args:
+            series (pd.Series): Values on the keyword's stored scale, indexed by week
+            complete_until (Timestamp): Last week that will not change any more
+            replace (bool): Drop everything stored for the keyword first (a new stored scale)
+            fetched_from (Timestamp): Start of the timeframe the series was fetched for
+        """
+        points = [(keyword, geo, date.strftime('%Y-%m-%d'), int(value))
+                  for date, value in series.dropna().round().items()]
+        fetched_from = pd.Timestamp(fetched_from).strftime('%Y-%m-%d') if fetched_from is not None else None
+        with self._lock, self._conn:
+            if not replace:
+                row = self._conn.execute(
+                    "SELECT fetched_from FROM historical_coverage WHERE keyword = ? AND geo = ?", (keyword, geo)
+                ).fetchone()
+                if row and row[0]:
+                    fetched_from = min(row[0], fetched_from) if fetched_from else row[0]
+            if replace:
+                self._conn.execute("DELETE FROM historical_data WHERE keyword = ? AND geo = ?", (keyword, geo))
+                # Factors of other groups pointed at the old scale
+                self._conn.execute(
+                    "DELETE FROM historical_scales WHERE geo = ? AND group_key IN "
+                    "(SELECT group_key FROM historical_scales WHERE keyword = ? AND geo = ?)",
+                    (geo, keyword, geo)
+                )
+            self._conn.executemany("INSERT OR REPLACE INTO historical_data VALUES (?, ?, ?, ?)", points)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO historical_coverage VALUES (?, ?, ?, ?, ?)",
+                (keyword, geo, pd.Timestamp(complete_until).strftime('%Y-%m-%d'), time.time(), fetched_from)
+            )
+            self.generation += 1
+
+    def factors(self, keywords, geo=''):
+        """Return the keyword -> factor map of the group, or None if it was never fetched together."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT keyword, factor FROM historical_scales WHERE group_key = ? AND geo = ?",
+                (self.group_key(keywords), geo)
+            ).fetchall()
+        factors = dict(rows)
+        return factors if all(k in factors for k in keywords) else None
+
+    def set_factors(self, keywords, geo, factors):
+        """Record the stored-scale factor of every keyword for a group fetched together."""
+        key = self.group_key(keywords)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO historical_scales VALUES (?, ?, ?, ?)",
+                [(key, geo, keyword, float(factors[keyword])) for keyword in keywords]
+            )
+            self.generation += 1
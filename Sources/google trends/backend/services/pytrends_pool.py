@@ -0,0 +1,94 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+DEFAULT_POOL_SIZE = int(os.environ.get('PYTRENDS_POOL_SIZE', 4))
+
+
+class PytrendsPool:
+    """Bounded pool of independent pytrends clients [BE-02].
+
+    A TrendReq keeps the last payload in the object, so build_payload and the
+    calls reading it must run on a client nobody else is using. Each request
+    checks a client out for its whole payload/fetch sequence and checks it back
+    in afterwards. Clients are created lazily, up to size.
+    """
+
+    def __init__(self, factory, size=DEFAULT_POOL_SIZE, timeout=30):
+        """
+        Args:
+            factory (callable): Creates a new client, e.g. lambda: TrendReq(hl='en-US', tz=360)
+            size (int): Maximum number of clients
+            timeout (float): Seconds checkout waits for a free client
+        """
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._idle = []
+        self._created = 0
+
+    def checkout(self, timeout=None):
+        """Take a client from the pool, creating one if below size.
+
+        Raises:
+            TimeoutError: If no client is free within the timeout
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No pytrends client free after {self.timeout}s")
+                self._cond.wait(remaining)
+
+        # Create outside the lock, TrendReq may go to the network
+        try:
+            return self.factory()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def checkin(self, client):
+        """Return a client to the pool."""
+        with self._cond:
+            self._idle.append(client)
+            self._cond.notify()
+
+    def discard(self, client):
+        """Drop a client whose session may be broken, freeing its slot."""
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def client(self, timeout=None):
+        """Check a client out for the duration of a with block.
+
+        The client is discarded instead of returned if the block raises.
+        """
+        client = self.checkout(timeout)
+        try:
+            yield client
+        except BaseException:
+            self.discard(client)
+            raise
+        self.checkin(client)
+
+    def stats(self):
+        """Return the pool size and how many clients exist, are idle and in use."""
+        with self._cond:
+            return {
+                'size': self.size,
+                'created': self._created,
+                'idle': len(self._idle),
+                'in_use': self._created - len(self._idle)
+            }
@@ -0,0 +1,349 @@
+import os
+import time
+import heapq
+import sqlite3
+import itertools
+import threading
+from contextlib import contextmanager
+from services.trends_cache import sqlite_path
+
+# Priority classes, lower is served first
+INTERACTIVE = 0
+BACKGROUND = 1
+BATCH = 2
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BACKGROUND: 'background', BATCH: 'batch'}
+
+# Sustained Google Trends requests per minute and how many may go back to back
+DEFAULT_RATE_PER_MINUTE = float(os.environ.get('TRENDS_RATE_PER_MINUTE', 20))
+DEFAULT_BURST = float(os.environ.get('TRENDS_RATE_BURST', 5))
+
+# Seconds a caller of each class waits for a token by default before giving up,
+# an interactive request is better served from the cache or mock data than late
+MAX_WAIT = {
+    INTERACTIVE: float(os.environ.get('TRENDS_INTERACTIVE_MAX_WAIT', 10)),
+    BACKGROUND: None,
+    BATCH: None
+}
+
+# Seconds between retries of a process waiting on the shared bucket, and after
+# which a waiter that stopped retrying (its process died) no longer counts
+SHARED_POLL_INTERVAL = 1.0
+SHARED_WAITER_TTL = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rate_limit_waiters (
+    name TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (name, owner)
+);
+"""
+
+_local = threading.local()
+
+
+class RateLimitTimeout(TimeoutError):
+    """Raised when no token could be taken in time; upstream was never called."""
+
+
+def current_priority():
+    """Return the traffic class of the calling thread (interactive by default)."""
+    return getattr(_local, 'priority', INTERACTIVE)
+
+
+@contextmanager
+def traffic_class(priority):
+    """Run a block with upstream calls counted in the given priority class."""
+    previous = current_priority()
+    _local.priority = priority
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+class SharedBucket:
+    """Token bucket state in the rate_limit_buckets table, shared by every process using the database
+
+    Each take runs in an immediate transaction, so processes never hand out
+    the same token. A process whose next caller has to wait records that
+    caller's priority in rate_limit_waiters; the other processes leave the
+    free tokens to it while their own next caller has a lower priority.
+    """
+
+    def __init__(self, database_url, name, rate, burst):
+        """
+        Args:
+            database_url (str): sqlite:/// URL of a database file
+            name (str): Bucket name, processes with the same name share the budget
+            rate (float): Tokens per second
+            burst (float): Bucket size
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.owner = f"{os.getpid()}-{os.urandom(4).hex()}"
+        # One connection, so the threads of this process take turns on it
+        self._lock = threading.Lock()
+        # Autocommit, transactions are opened explicitly. Waiting on another
+        # process's transaction is bounded by the poll interval, then retried
+        self._conn = sqlite3.connect(sqlite_path(database_url), timeout=SHARED_POLL_INTERVAL,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.executescript(SCHEMA)
+
+    def _tokens(self, now):
+        row = self._conn.execute(
+            "SELECT tokens, updated_at FROM rate_limit_buckets WHERE name = ?", (self.name,)
+        ).fetchone()
+        if row is None:
+            return self.burst
+        return min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+
+    def take(self, priority):
+        """
+        Take a token unless none is free or another process has a more urgent caller waiting.
+
+        Returns:
+            float: 0 if a token was taken, else seconds before trying again
+        """
+        with self._lock:
+            return self._take(priority)
+
+    def _take(self, priority):
+        # Caller holds the lock
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            # Another process is holding the database, try again like any waiter
+            return SHARED_POLL_INTERVAL
+        now = time.time()
+        try:
+            tokens = self._tokens(now)
+            ahead = self._conn.execute(
+                "SELECT 1 FROM rate_limit_waiters WHERE name = ? AND owner != ? AND priority < ? AND seen_at > ?",
+                (self.name, self.owner, priority, now - SHARED_WAITER_TTL)
+            ).fetchone()
+            if ahead is None and tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+                self._conn.execute(
+                    "DELETE FROM rate_limit_waiters WHERE name = ? AND owner = ?", (self.name, self.owner)
+                )
+            else:
+                wait = SHARED_POLL_INTERVAL if ahead is not None else (1 - tokens) / self.rate
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_limit_waiters VALUES (?, ?, ?, ?)",
+                    (self.name, self.owner, priority, now)
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets VALUES (?, ?, ?)", (self.name, tokens, now)
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        # Retry at least every poll interval, other processes do not wake us up
+        return min(wait, SHARED_POLL_INTERVAL)
+
+    def withdraw(self):
+        """Stop holding back other processes, this one has nobody waiting any more."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM rate_limit_waiters WHERE name = ? AND owner = ?", (self.name, self.owner)
+            )
+
+    def tokens(self):
+        """Return the tokens currently free."""
+        with self._lock:
+            return self._tokens(time.time())
+
+
+class RateLimiter:
+    """Token bucket for all Google Trends traffic, serving waiters by priority [BE-02]
+
+    Tokens refill at rate_per_minute up to burst. When callers have to wait,
+    the next token always goes to the highest priority class waiting, first
+    come first served within a class, so interactive requests overtake
+    queued background refreshes and batch downloads.
+
+    Given a database_url, the bucket itself lives in the database (see
+    SharedBucket), so the API and the batch downloader, in separate
+    processes, draw on one budget. The database is only used outside the
+    limiter's own lock: a transaction waiting on another process holds up
+    the caller at the head of the queue, not every thread using the limiter.
+    """
+
+    def __init__(self, rate_per_minute=DEFAULT_RATE_PER_MINUTE, burst=DEFAULT_BURST, database_url=None,
+                 name='google_trends'):
+        """
+        Args:
+            rate_per_minute (float): Sustained requests per minute
+            burst (float): Bucket size, requests allowed back to back after a pause
+            database_url (str): sqlite:/// URL of the shared bucket (default: this process only)
+            name (str): Name of the shared bucket
+
+        Raises:
+            ValueError: If rate_per_minute is not positive
+        """
+        if not rate_per_minute > 0:
+            raise ValueError(f"rate_per_minute must be positive, got {rate_per_minute}")
+        self.rate = rate_per_minute / 60.0
+        self.burst = max(1.0, burst)
+        self._shared = None
+        if database_url and sqlite_path(database_url) != ':memory:':
+            try:
+                self._shared = SharedBucket(database_url, name, self.rate, self.burst)
+            except sqlite3.Error as e:
+                print(f"Warning: Rate limit not shared with other processes: {e}")
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []
+        # True while the head of the queue is taking a token from the shared bucket
+        self._taking = False
+        self._sequence = itertools.count()
+        self._stats = {
+            name: {'acquired': 0, 'timeouts': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+
+    def _refill(self):
+        # Caller holds the lock
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self, priority):
+        # Caller holds the lock and heads the queue, returns 0 if a token was taken,
+        # else seconds until the next one
+        shared = self._shared
+        if shared is not None:
+            # The lock is released while waiting on the database
+            self._taking = True
+            self._cond.release()
+            try:
+                return shared.take(priority)
+            except sqlite3.Error as e:
+                print(f"Error using the shared rate limit, falling back to this process: {e}")
+                self._shared = None
+            finally:
+                self._cond.acquire()
+                self._taking = False
+                # A caller that got ahead of us in the meantime is now the head
+                self._cond.notify_all()
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _withdraw(self):
+        # Called without the lock
+        shared = self._shared
+        if shared is not None:
+            with self._cond:
+                if self._waiters:
+                    return
+            try:
+                shared.withdraw()
+            except sqlite3.Error as e:
+                print(f"Error using the shared rate limit: {e}")
+
+    def acquire(self, priority=None, timeout=None):
+        """
+        Take one token, waiting behind higher priority callers if needed.
+
+        Args:
+            priority (int): INTERACTIVE, BACKGROUND or BATCH (default: the thread's traffic class)
+            timeout (float): Seconds to wait at most (default: MAX_WAIT of the priority class)
+
+        Returns:
+            float: Seconds waited
+
+        Raises:
+            RateLimitTimeout: If no token could be taken in time
+        """
+        priority = current_priority() if priority is None else priority
+        timeout = MAX_WAIT[priority] if timeout is None else timeout
+        stats = self._stats[PRIORITY_NAMES[priority]]
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        ticket = (priority, next(self._sequence))
+
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            while True:
+                # Only the head of the queue takes tokens, the others sleep until woken
+                wait = None
+                if self._waiters[0] == ticket and not self._taking:
+                    wait = self._take(priority)
+                if wait == 0:
+                    # Others may have joined the queue while the lock was released
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    # The next waiter may be able to go too
+                    self._cond.notify_all()
+                    break
+
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                    stats['timeouts'] += 1
+                    break
+
+                if deadline is not None:
+                    wait = deadline - now if wait is None else min(wait, deadline - now)
+                self._cond.wait(wait)
+
+            taken = wait == 0
+            if taken:
+                waited = time.monotonic() - start
+                stats['acquired'] += 1
+                stats['total_wait'] += waited
+                stats['max_wait'] = max(stats['max_wait'], waited)
+        if not taken:
+            self._withdraw()
+            raise RateLimitTimeout(f"No Google Trends request slot within {timeout}s")
+        return waited
+
+    def stats(self):
+        """Return the tokens available, queue depth per class and wait times."""
+        shared_tokens = None
+        shared = self._shared
+        if shared is not None:
+            try:
+                shared_tokens = shared.tokens()
+            except sqlite3.Error as e:
+                print(f"Error reading the shared rate limit: {e}")
+        with self._cond:
+            self._refill()
+            tokens = self._tokens if shared_tokens is None else shared_tokens
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self._waiters:
+                depth[PRIORITY_NAMES[priority]] += 1
+            return {
+                'rate_per_minute': round(self.rate * 60, 3),
+                'burst': self.burst,
+                'tokens': round(tokens, 3),
+                'shared': self._shared is not None,
+                'queue_depth': depth,
+                'classes': {
+                    name: {
+                        **values,
+                        'avg_wait': round(values['total_wait'] / values['acquired'], 4) if values['acquired'] else 0.0,
+                        'total_wait': round(values['total_wait'], 4),
+                        'max_wait': round(values['max_wait'], 4)
+                    }
+                    for name, values in self._stats.items()
+                }
+            }
@@ -0,0 +1,213 @@
+import json
+import time
+import threading
+from collections import deque
+from services.rate_limiter import BACKGROUND, traffic_class
+
+# Default refresh budget and watchlist sweep period
+DEFAULT_REQUESTS_PER_MINUTE = 6
+DEFAULT_INTERVAL = 60 * 60
+
+
+def parse_watchlist(value):
+    """
+    Parse the TRENDS_WATCHLIST setting.
+
+    Accepts a JSON list of {"keywords": [...], "geo": "IT", "timeframe": ..., "category": ...}
+    entries, or a plain 'kw1,kw2;kw3' string where ';' separates entries.
+    """
+    if not value:
+        return []
+    if isinstance(value, list):
+        entries = value
+    else:
+        try:
+            entries = json.loads(value)
+        except ValueError:
+            entries = [{'keywords': group.split(',')} for group in value.split(';')]
+    watchlist = []
+    for entry in entries:
+        keywords = [k.strip() for k in entry.get('keywords', []) if k.strip()]
+        if keywords:
+            watchlist.append({
+                'keywords': keywords,
+                'geo': entry.get('geo', ''),
+                'timeframe': entry.get('timeframe', 'today 3-m'),
+                'category': int(entry.get('category', 0))
+            })
+    return watchlist
+
+
+class SchedulerService:
+    """Background refresh of cached trends under a request budget [BE-07]"""
+
+    def __init__(self, trends_service, watchlist=None, regions=None,
+                 interval=DEFAULT_INTERVAL, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE):
+        """
+        Initialize the scheduler.
+
+        Args:
+            trends_service (TrendsService): Service whose cache is kept warm
+            watchlist (list): Keyword searches to refresh, see parse_watchlist
+            regions (list): Region names to refresh, as used by /api/trends/geographic
+            interval (int): Seconds between watchlist sweeps
+            requests_per_minute (float): Refresh jobs started per minute at most
+        """
+        self.trends_service = trends_service
+        self.watchlist = watchlist or []
+        self.regions = [r.strip().lower() for r in (regions or []) if r.strip()]
+        self.interval = interval
+        self.spacing = 60.0 / max(requests_per_minute, 0.001)
+
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._pending = set()
+        self._thread = None
+        self._running = False
+        self._next_sweep = 0.0
+        self.stats = {'completed': 0, 'failed': 0, 'requested': 0, 'last_sweep': None, 'last_error': None}
+
+    def start(self):
+        """Start the background worker thread."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='trends-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """Stop the worker after the job it is running."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def request_refresh(self, key, job):
+        """
+        Queue a refresh requested by a user seeing stale data.
+
+        Requested refreshes go ahead of watchlist sweeps. A key already queued
+        is not added twice.
+
+        Returns:
+            bool: True if the refresh is queued, False if the scheduler is stopped
+        """
+        with self._cond:
+            if not self._running:
+                return False
+            if key not in self._pending:
+                self._pending.add(key)
+                self._queue.appendleft((key, job))
+                self.stats['requested'] += 1
+                self._cond.notify()
+            return True
+
+    def _enqueue(self, key, job):
+        if key not in self._pending:
+            self._pending.add(key)
+            self._queue.append((key, job))
+
+    def _sweep(self):
+        """Queue the watchlist entries whose cached result expires before the next sweep."""
+        service = self.trends_service
+        horizon = time.time() + self.interval
+        for entry in self.watchlist:
+            keywords, geo = entry['keywords'], entry['geo']
+            timeframe, category = entry['timeframe'], entry['category']
+            if self._fresh_until('search', keywords, geo, timeframe, category) > horizon:
+                continue
+            self._enqueue(
+                service._flight_key('search', keywords, geo, timeframe, category),
+                lambda k=keywords, g=geo, t=timeframe, c=category: service.refresh_search_trends(k, g, t, c)
+            )
+        for region in self.regions:
+            if self._fresh_until('regional', [], region, 'COUNTRY', 0) > horizon:
+                continue
+            self._enqueue(
+                service._flight_key('regional', [], region, 'COUNTRY', 0),
+                lambda r=region: service.refresh_regional_trends(r)
+            )
+        self.stats['last_sweep'] = time.time()
+
+    def _fresh_until(self, endpoint, keywords, geo, timeframe, category):
+        cache = self.trends_service.cache
+        if cache is None:
+            return 0
+        entry = cache.lookup(endpoint, keywords, geo=geo, timeframe=timeframe, category=category)
+        return entry[1] if entry is not None else 0
+
+    def _run(self):
+        next_slot = time.monotonic()
+        while True:
+            with self._cond:
+                while self._running:
+                    if time.monotonic() >= self._next_sweep:
+                        self._next_sweep = time.monotonic() + self.interval
+                        self._sweep()
+                    if self._queue:
+                        break
+                    self._cond.wait(max(0.0, self._next_sweep - time.monotonic()))
+                if not self._running:
+                    return
+
+            # Keep to the budget, whatever is queued
+            delay = next_slot - time.monotonic()
+            if delay > 0:
+                with self._cond:
+                    self._cond.wait_for(lambda: not self._running, timeout=delay)
+                    if not self._running:
+                        return
+
+            with self._cond:
+                key, job = self._queue.popleft()
+            next_slot = time.monotonic() + self.spacing
+            try:
+                # Refreshes queue behind interactive requests for upstream slots
+                with traffic_class(BACKGROUND):
+                    job()
+                self.stats['completed'] += 1
+            except Exception as e:
+                print(f"Error refreshing {key}: {e}")
+                self.stats['failed'] += 1
+                self.stats['last_error'] = str(e)
+            finally:
+                with self._cond:
+                    self._pending.discard(key)
+
+    def status(self):
+        """Return the queue, budget and counters of the scheduler."""
+        with self._cond:
+            return {
+                'running': self._running,
+                'queued': len(self._queue),
+                'requests_per_minute': round(60.0 / self.spacing, 3),
+                'interval': self.interval,
+                'watchlist': self.watchlist,
+                'regions': self.regions,
+                **self.stats
+            }
+
+
+def init_scheduler(app, trends_service):
+    """
+    Start a SchedulerService for the shared TrendsService from the app config.
+
+    Uses TRENDS_WATCHLIST, TRENDS_WATCH_REGIONS, SCHEDULER_INTERVAL and
+    SCHEDULER_REQUESTS_PER_MINUTE. The service keeps one scheduler even if
+    several apps are created.
+    """
+    if trends_service.scheduler is None:
+        regions = app.config.get('TRENDS_WATCH_REGIONS') or ''
+        scheduler = SchedulerService(
+            trends_service,
+            watchlist=parse_watchlist(app.config.get('TRENDS_WATCHLIST')),
+            regions=regions.split(',') if isinstance(regions, str) else regions,
+            interval=int(app.config.get('SCHEDULER_INTERVAL', DEFAULT_INTERVAL)),
+            requests_per_minute=float(app.config.get('SCHEDULER_REQUESTS_PER_MINUTE', DEFAULT_REQUESTS_PER_MINUTE))
+        )
+        scheduler.start()
+        trends_service.scheduler = scheduler
+    app.extensions['scheduler'] = trends_service.scheduler
+    return trends_service.scheduler
@@ -0,0 +1,62 @@
+import threading
+
+
+class _Call:
+    """One in-flight call and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into a single execution.
+
+    The first caller for a key runs the function, callers arriving while it is
+    in flight wait and receive the same result (or exception). Nothing is kept
+    once the call completes, later callers start a new one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Run fn() once for all concurrent callers with the same key.
+
+        Args:
+            key (hashable): Identity of the call
+            fn (callable): Function to run if no call for key is in flight
+
+        Returns:
+            The result of fn()
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        """Return the number of calls currently running."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,321 @@
+import os
+import json
+import time
+import queue
+import itertools
+import threading
+from services.rate_limiter import BACKGROUND, traffic_class
+from services.trends_service import get_trends_service, fallback_scope
+
+# Seconds between polls of the watched subjects, and between keepalive comments
+DEFAULT_STREAM_INTERVAL = float(os.environ.get('TRENDS_STREAM_INTERVAL', 60))
+DEFAULT_KEEPALIVE = float(os.environ.get('TRENDS_STREAM_KEEPALIVE', 15))
+
+# Events buffered per client before it is considered too slow and resynced
+DEFAULT_QUEUE_SIZE = 100
+
+
+def subject_id(subject):
+    """Name a subject ('current', geo, keywords) as used in the events."""
+    endpoint, geo, keywords = subject
+    if endpoint == 'current':
+        return f"current:{geo}"
+    return f"search:{geo}:{','.join(keywords)}"
+
+
+def diff_trending(old, new):
+    """
+    Compare two trending lists.
+
+    Returns:
+        dict: Added trends, removed topics, changed details and the new order
+        when it changed, or None if the lists are the same
+    """
+    old_details = {trend['topic']: trend.get('details') for trend in old}
+    new_details = {trend['topic']: trend.get('details') for trend in new}
+    diff = {}
+    added = [trend for trend in new if trend['topic'] not in old_details]
+    removed = [topic for topic in old_details if topic not in new_details]
+    changed = {
+        topic: details for topic, details in new_details.items()
+        if topic in old_details and old_details[topic] != details
+    }
+    if added:
+        diff['added'] = added
+    if removed:
+        diff['removed'] = removed
+    if changed:
+        diff['changed'] = changed
+    # The order is only needed to place new topics or if the others moved
+    order = [trend['topic'] for trend in new]
+    if added or [topic for topic in old_details if topic in new_details] != order:
+        diff['order'] = order
+    return diff or None
+
+
+def diff_series(old, new):
+    """
+    Compare two interest over time series, as lists of rows with a 'date'.
+
+    Returns:
+        dict: New or changed rows and dates no longer in the series, or None
+        if the series are the same
+    """
+    old_rows = {row['date']: row for row in old}
+    new_dates = {row['date'] for row in new}
+    diff = {}
+    rows = [row for row in new if old_rows.get(row['date']) != row]
+    removed = [date for date in old_rows if date not in new_dates]
+    if rows:
+        diff['rows'] = rows
+    if removed:
+        diff['removed'] = removed
+    return diff or None
+
+
+def format_event(event, data, event_id=None):
+    """Encode one server-sent event."""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'), default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscription:
+    """One connected client: the subjects it watches and its pending events."""
+
+    def __init__(self, subjects, queue_size=DEFAULT_QUEUE_SIZE):
+        self.subjects = list(dict.fromkeys(subjects))
+        self.queue = queue.Queue(maxsize=queue_size)
+
+
+class TrendStream:
+    """Single producer of trend updates fanned out to all stream clients [BE-08]
+
+    One background thread polls the subjects that at least one client
+    watches, through the cached TrendsService, so any number of clients
+    costs one refresh loop. An event is published only when a subject's
+    data changed, as a compact diff from the previous version; every new
+    client first receives a snapshot of each of its subjects.
+    
+    While the service is degraded its answers are mock or stale data, so
+    nothing is polled or published; clients get one 'status' event when
+    that starts and one when it ends. A poll answered from a fallback while
+    the circuit is closed is dropped the same way, so mock or zeroed data
+    never replaces the last real version.
+    """
+
+    def __init__(self, trends_service, interval=DEFAULT_STREAM_INTERVAL, keepalive=DEFAULT_KEEPALIVE):
+        """
+        Args:
+            trends_service (TrendsService): Service the data is read from
+            interval (float): Seconds between polls of the watched subjects
+            keepalive (float): Seconds of silence before a keepalive comment is sent
+        """
+        self.trends_service = trends_service
+        self.interval = interval
+        self.keepalive = keepalive
+
+        self._cond = threading.Condition()
+        self._subscriptions = set()
+        self._latest = {}
+        self._due = set()
+        self._ids = itertools.count(1)
+        self._thread = None
+        self._degraded = False
+        self.stats = {'events': 0, 'resyncs': 0, 'polls': 0, 'errors': 0, 'fallbacks': 0, 'last_poll': None}
+
+    def subscribe(self, subjects):
+        """
+        Register a client for the given subjects and queue its snapshots.
+
+        Args:
+            subjects (list): (endpoint, geo, keywords) tuples, endpoint being 'current' or 'search'
+
+        Returns:
+            Subscription: Pass it to events() to stream to the client
+        """
+        subscription = Subscription(subjects)
+        with self._cond:
+            self._subscriptions.add(subscription)
+            for subject in subscription.subjects:
+                if subject in self._latest:
+                    subscription.queue.put_nowait(self._snapshot_event(subject))
+                else:
+                    self._due.add(subject)
+            if self._degraded:
+                subscription.queue.put_nowait(self._status_event())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='trends-stream', daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._cond:
+            self._subscriptions.discard(subscription)
+
+    def events(self, subscription):
+        """Yield the encoded events of a subscription until the client disconnects."""
+        try:
+            # Ask browsers to reconnect after five seconds when the connection drops
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    yield subscription.queue.get(timeout=self.keepalive)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+        finally:
+            self.unsubscribe(subscription)
+
+    def _snapshot_event(self, subject):
+        # Caller holds the lock
+        event_id, data = self._latest[subject]
+        return format_event('snapshot', {'subject': subject_id(subject), 'data': data}, event_id)
+
+    def _status_event(self):
+        # Caller holds the lock
+        return format_event('status', {'degraded': self._degraded})
+        
+    def _watched(self):
+        # Caller holds the lock
+        return {subject for subscription in self._subscriptions for subject in subscription.subjects}
+
+    def _fetch(self, subject):
+        """Return the subject's current data and whether it came from a fallback."""
+        endpoint, geo, keywords = subject
+        with fallback_scope() as scope:
+            if endpoint == 'current':
+                data = self.trends_service.get_current_trends(geo=geo)
+            else:
+                data = self.trends_service.search_trends(list(keywords), geo=geo).get('interest_over_time') or []
+        return data, scope.fallback
+
+    def _publish(self, subject, data):
+        """Store the new version of a subject and send what changed to its clients."""
+        with self._cond:
+            previous = self._latest.get(subject)
+            if previous is None:
+                # First version: nobody has it yet, so everyone gets a snapshot
+                self._latest[subject] = (next(self._ids), data)
+                event = self._snapshot_event(subject)
+            else:
+                differ = diff_trending if subject[0] == 'current' else diff_series
+                diff = differ(previous[1], data)
+                if diff is None:
+                    return
+                event_id = next(self._ids)
+                self._latest[subject] = (event_id, data)
+                event = format_event('diff', {'subject': subject_id(subject), 'diff': diff}, event_id)
+            self.stats['events'] += 1
+            # Encoded once, shared by every client watching the subject
+            for subscription in self._subscriptions:
+                if subject in subscription.subjects:
+                    self._deliver(subscription, event)
+
+    def _set_degraded(self, degraded):
+        """Tell every client once when the service becomes degraded or recovers."""
+        with self._cond:
+            if degraded == self._degraded:
+                return
+            self._degraded = degraded
+            event = self._status_event()
+            for subscription in self._subscriptions:
+                self._deliver(subscription, event)
+                
+    def _deliver(self, subscription, event):
+        # Caller holds the lock
+        try:
+            subscription.queue.put_nowait(event)
+        except queue.Full:
+            # The client fell behind: drop its backlog and send it fresh snapshots
+            while True:
+                try:
+                    subscription.queue.get_nowait()
+                except queue.Empty:
+                    break
+            for subject in subscription.subjects:
+                if subject in self._latest:
+                    subscription.queue.put_nowait(self._snapshot_event(subject))
+            if self._degraded:
+                subscription.queue.put_nowait(self._status_event())
+            self.stats['resyncs'] += 1
+
+    def _run(self):
+        next_poll = time.monotonic() + self.interval
+        while True:
+            with self._cond:
+                while True:
+                    watched = self._watched()
+                    # Forget subjects nobody watches any more
+                    for subject in set(self._latest) - watched:
+                        del self._latest[subject]
+                    self._due &= watched
+                    if self._due or (watched and time.monotonic() >= next_poll):
+                        break
+                    self._cond.wait(max(0.0, next_poll - time.monotonic()) if watched else None)
+
+                if time.monotonic() >= next_poll:
+                    subjects = watched
+                    next_poll = time.monotonic() + self.interval
+                    self.stats['polls'] += 1
+                    self.stats['last_poll'] = time.time()
+                else:
+                    subjects = set(self._due)
+                self._due.clear()
+
+            # Mock data differs on every call, publishing it would send diffs on every poll
+            self._set_degraded(self.trends_service.degraded)
+            if self._degraded:
+                continue
+                
+            # Polling waits behind interactive requests for upstream slots
+            with traffic_class(BACKGROUND):
+                for subject in subjects:
+                    try:
+                        data, fallback = self._fetch(subject)
+                        # The circuit may have opened during the fetch
+                        self._set_degraded(self.trends_service.degraded)
+                        if self._degraded:
+                            break
+                        if fallback:
+                            # Diffing it against the real baseline would push made-up changes
+                            self.stats['fallbacks'] += 1
+                            continue
+                        self._publish(subject, data)
+                    except Exception as e:
+                        print(f"Error streaming {subject_id(subject)}: {e}")
+                        self.stats['errors'] += 1
+
+    def status(self):
+        """Return the connected clients, watched subjects and counters."""
+        with self._cond:
+            return {
+                'clients': len(self._subscriptions),
+                'subjects': sorted(subject_id(subject) for subject in self._watched()),
+                'interval': self.interval,
+                'degraded': self._degraded,
+                **self.stats
+            }
+
+
+_shared_streams = {}
+_shared_lock = threading.Lock()
+
+
+def get_trend_stream(trends_service=None):
+    """
+    Return the TrendStream shared by all stream clients of a service, so they share one refresh loop.
+    
+    Args:
+        trends_service (TrendsService): Service the stream reads (default: get_trends_service())
+    """
+    trends_service = trends_service if trends_service is not None else get_trends_service()
+    stream = _shared_streams.get(trends_service)
+    if stream is None:
+        with _shared_lock:
+            stream = _shared_streams.get(trends_service)
+            if stream is None:
+                stream = _shared_streams[trends_service] = TrendStream(trends_service)
+    return stream
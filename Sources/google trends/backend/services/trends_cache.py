@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+DEFAULT_DATABASE_URL = 'sqlite:///trends.db'
+
+# Seconds a cached result stays fresh, per endpoint
+DEFAULT_TTLS = {
+    'current': 30 * 60,
+    'search': 6 * 60 * 60,
+    'regional': 60 * 60,
+    'details': 60 * 60,
+    'geo': 60 * 60,
+}
+
+# Seconds an expired result may still be served while a refresh is pending
+DEFAULT_MAX_STALE = 24 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trends_cache (
+    cache_key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    keywords TEXT NOT NULL,
+    geo TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    category INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trends_cache_expires ON trends_cache (expires_at);
+"""
+
+
+def sqlite_path(database_url):
+    """Turn a 'sqlite:///path' URL into the path sqlite3 expects."""
+    if not database_url.startswith('sqlite://'):
+        raise ValueError(f"Only sqlite:// database URLs are supported, got {database_url!r}")
+    path = database_url[len('sqlite://'):]
+    if path in ('', '/', '/:memory:'):
+        return ':memory:'
+    # sqlite:///trends.db is relative, sqlite:////var/db/trends.db is absolute
+    return path[1:] if path.startswith('/') else path
+
+
+def _to_json(value):
+    # numpy scalars coming out of pandas
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+class TrendsCache:
+    """Persistent TTL cache for processed trend results in the TrendsTable [BE-08, DB-01]"""
+
+    def __init__(self, database_url=None, ttls=None, max_stale=DEFAULT_MAX_STALE):
+        """
+        Open (and create if needed) the cache table.
+
+        Args:
+            database_url (str): sqlite:/// URL, DATABASE_URL from the environment by default
+            ttls (dict): Seconds each endpoint stays fresh, merged over DEFAULT_TTLS
+            max_stale (int): Seconds past expiry a result is kept for stale-while-revalidate
+        """
+        self.database_url = database_url or os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_stale = max_stale
+        # Bumped on every write, so callers can tell the cached data changed
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(sqlite_path(self.database_url), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    @staticmethod
+    def normalize(keywords, geo='', timeframe='', category=0):
+        """Return the canonical (keywords, geo, timeframe, category) of a request."""
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        keywords = [k.strip() for k in keywords if k and k.strip()]
+        return keywords, (geo or '').strip().upper(), (timeframe or '').strip(), int(category or 0)
+
+    def make_key(self, endpoint, keywords, geo='', timeframe='', category=0):
+        """Hash the normalized request into the cache key."""
+        keywords, geo, timeframe, category = self.normalize(keywords, geo, timeframe, category)
+        raw = json.dumps([endpoint, keywords, geo, timeframe, category], ensure_ascii=False)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, endpoint, keywords, geo='', timeframe='', category=0):
+        """Return the cached result, or None if missing or expired."""
+        entry = self.lookup(endpoint, keywords, geo, timeframe, category)
+        return entry[0] if entry is not None and entry[1] > time.time() else None
+
+    def lookup(self, endpoint, keywords, geo='', timeframe='', category=0):
+        """
+        Return a result that is fresh or within max_stale of its expiry.
+
+        Returns:
+            tuple: (value, expires_at), or None on a miss
+        """
+        key = self.make_key(endpoint, keywords, geo, timeframe, category)
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT payload, expires_at FROM trends_cache WHERE cache_key = ? AND expires_at > ?",
+                    (key, time.time() - self.max_stale)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading trends cache: {e}")
+            return None
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def set(self, endpoint, keywords, value, geo='', timeframe='', category=0):
+        """Store a result for the endpoint's TTL."""
+        key = self.make_key(endpoint, keywords, geo, timeframe, category)
+        keywords, geo, timeframe, category = self.normalize(keywords, geo, timeframe, category)
+        now = time.time()
+        try:
+            payload = json.dumps(value, default=_to_json)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO trends_cache "
+                    "(cache_key, endpoint, keywords, geo, timeframe, category, payload, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, endpoint, json.dumps(keywords, ensure_ascii=False), geo, timeframe, category,
+                     payload, now, now + self.ttls.get(endpoint, DEFAULT_TTLS['search']))
+                )
+                self.generation += 1
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Error writing trends cache: {e}")
+
+    def purge_expired(self):
+        """Delete rows too old to be served even stale and return how many were removed."""
+        with self._lock, self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM trends_cache WHERE expires_at <= ?", (time.time() - self.max_stale,)
+            ).rowcount
+            if removed:
+                self.generation += 1
+            return removed
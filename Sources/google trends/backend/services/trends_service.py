@@ -1,23 +1,144 @@
 import pandas as pd
 from pytrends.request import TrendReq
 from datetime import datetime, timedelta
+import os
+import re
+import time
 import random
 import json
+import threading
+from contextlib import contextmanager
+from flask import g
+from concurrent.futures import ThreadPoolExecutor
+from services.trends_cache import TrendsCache, DEFAULT_DATABASE_URL
+from services.single_flight import SingleFlight
+from services.pytrends_pool import PytrendsPool, DEFAULT_POOL_SIZE
+from services.history_store import HistoryStore, HISTORY_TTL, week_start, to_weekly
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.rate_limiter import RateLimiter, RateLimitTimeout, current_priority, traffic_class, PRIORITY_NAMES
+from utils.metrics import Counter, Gauge, Histogram
+
+# Google Trends compares at most five keywords per payload
+MAX_KEYWORDS_PER_PAYLOAD = 5
+
+# Weeks of stored history re-fetched with a gap, to rescale the new points
+HISTORY_OVERLAP_WEEKS = 8
+
+UPSTREAM_CALLS = Counter(
+    'trends_upstream_calls_total', 'Google Trends calls by pytrends method and outcome', ('method', 'outcome')
+)
+UPSTREAM_DURATION = Histogram(
+    'trends_upstream_duration_seconds', 'Duration of Google Trends calls, rate limit wait excluded', ('method',)
+)
+RATE_LIMIT_WAIT = Histogram(
+    'trends_rate_limit_wait_seconds', 'Time waited for a Google Trends request slot', ('priority',)
+)
+MOCK_FALLBACKS = Counter(
+    'trends_mock_fallbacks_total', 'Responses built from mock data instead of Google Trends', ('kind',)
+)
+CACHE_LOOKUPS = Counter(
+    'trends_cache_lookups_total', 'Trends cache lookups by result (hit, stale or miss)', ('endpoint', 'result')
+)
+
+_fallbacks = threading.local()
+
+
+class FallbackScope:
+    """Whether a result served inside a fallback_scope block came from a fallback."""
+    
+    def __init__(self):
+        self.fallback = False
+
+
+def _open_scopes():
+    if not hasattr(_fallbacks, 'scopes'):
+        _fallbacks.scopes = []
+    return _fallbacks.scopes
+
+
+@contextmanager
+def fallback_scope():
+    """
+    Track the fallbacks (mock data, zeroed details, empty distributions) served in a block.
+    
+    Results built from fallbacks are never cached, and callers comparing or
+    tagging data use the scope to tell them from real answers.
+    
+    Yields:
+        FallbackScope: fallback is True once this thread was served a fallback in the block
+    """
+    scope = FallbackScope()
+    scopes = _open_scopes()
+    scopes.append(scope)
+    try:
+        yield scope
+    finally:
+        scopes.remove(scope)
+
+
+def served_fallback():
+    """True if the innermost open fallback_scope of this thread was served a fallback."""
+    scopes = _open_scopes()
+    return scopes[-1].fallback if scopes else False
+
+
+def _note_fallback():
+    for scope in _open_scopes():
+        scope.fallback = True
+
 
 class TrendsService:
     """Service for fetching and processing Google Trends data [BE-02]"""
     
-    def __init__(self, hl='en-US', tz=360):
+    def __init__(self, hl='en-US', tz=360, cache=None, pool_size=DEFAULT_POOL_SIZE, history=None, breaker=None,
+                 limiter=None, database_url=None):
         """
         Initialize the TrendsService.
         
         Args:
             hl (str): Language (default 'en-US')
             tz (int): Timezone offset (default 360)
+            cache (TrendsCache): Result cache (default: SQLite cache at database_url)
+            pool_size (int): Maximum number of concurrent pytrends clients
+            history (HistoryStore): Weekly series store (default: SQLite store at database_url)
+            breaker (CircuitBreaker): Breaker around Google Trends calls (default thresholds from the environment)
+            limiter (RateLimiter): Token bucket every Google Trends call waits on (default: rate from the
+                environment, shared with other processes through database_url)
+            database_url (str): sqlite:/// URL of the default stores, DATABASE_URL from the environment by default
         """
+        self.database_url = database_url or os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+        try:
+            self.cache = cache if cache is not None else TrendsCache(self.database_url)
+        except Exception as e:
+            print(f"Warning: Trends cache disabled: {e}")
+            self.cache = None
+            
+        try:
+            self.history = history if history is not None else HistoryStore(self.database_url)
+        except Exception as e:
+            print(f"Warning: History store disabled: {e}")
+            self.history = None
+            
+        # Identical concurrent requests share one upstream call
+        self._flights = SingleFlight()
+        
+        # Tells this instance's data versions apart from other processes', see data_version
+        self._instance_id = '%08x' % random.getrandbits(32)
+        
+        # Set by SchedulerService, refreshes stale results in the background
+        self.scheduler = None
+        
+        # Stops calling Google while it keeps failing (e.g. 429s), see _upstream
+        self.breaker = breaker if breaker is not None else CircuitBreaker('google_trends', excluded=(RateLimitTimeout,))
+        
+        # Keeps all upstream traffic under Google's limits, interactive calls first
+        self.limiter = limiter if limiter is not None else RateLimiter(database_url=self.database_url)
+            
+        # Each upstream sequence runs on its own client, see PytrendsPool
+        self.pool = PytrendsPool(lambda: TrendReq(hl=hl, tz=tz), size=pool_size)
         try:
-            # Try with minimal parameters
-            self.pytrends = TrendReq(hl=hl, tz=tz)
+            # Create the first client up front to find out if the API is reachable
+            self.pool.checkin(self.pool.checkout())
             self.api_available = True
         except Exception as e:
             print(f"Warning: Error initializing TrendReq: {e}")
@@ -37,49 +158,229 @@ class TrendsService:
             {"topic": "Data Privacy", "details": {"current_interest": 45, "rising": True}}
         ]
         
+    def _cached(self, endpoint, keywords, geo='', timeframe='', category=0):
+        """
+        Look a result up in the cache.
+        
+        Returns:
+            tuple: (value, fresh), or None on a miss or without a cache
+        """
+        if self.cache is None:
+            return None
+        entry = self.cache.lookup(endpoint, keywords, geo=geo, timeframe=timeframe, category=category)
+        if entry is None:
+            CACHE_LOOKUPS.inc(endpoint=endpoint, result='miss')
+            return None
+        value, expires_at = entry
+        fresh = expires_at > time.time()
+        CACHE_LOOKUPS.inc(endpoint=endpoint, result='hit' if fresh else 'stale')
+        return value, fresh
+        
+    def _store(self, endpoint, keywords, value, geo='', timeframe='', category=0):
+        """Cache a result fetched upstream (callers never store fallbacks)."""
+        if self.cache is not None:
+            self.cache.set(endpoint, keywords, value, geo=geo, timeframe=timeframe, category=category)
+            
+    def _coalesced(self, endpoint, keywords, fetch, geo='', timeframe='', category=0):
+        """
+        Serve a request from the cache, or from one upstream call shared by all
+        concurrent callers asking for the same thing.
+        
+        With a scheduler running, an expired (stale) result is returned at once
+        and a background refresh is queued instead of waiting on Google. An
+        expired result is also returned when the fetch falls back, e.g. when
+        no request slot came up within the rate limiter's MAX_WAIT.
+        
+        Args:
+            endpoint (str): Cache endpoint name
+            keywords (list): Keywords of the request
+            fetch (callable): Fetches (and caches) the result on a miss, returns (result, fallback)
+            
+        Returns:
+            The cached or fetched result, fallbacks are noted in the open fallback_scope
+        """
+        key = self._flight_key(endpoint, keywords, geo, timeframe, category)
+        cached = self._cached(endpoint, keywords, geo=geo, timeframe=timeframe, category=category)
+        if cached is not None:
+            value, fresh = cached
+            # While upstream is failing a stale result beats mock data
+            if fresh or self.breaker.state == CircuitBreaker.OPEN:
+                return value
+            if self.scheduler is not None and self.scheduler.request_refresh(
+                    key, lambda: self._flights.do(key, fetch)):
+                return value
+                
+        value, fallback = self._flights.do(key, fetch)
+        if fallback and cached is not None:
+            # Upstream failed or had no request slot in time, a stale result beats mock data
+            return cached[0]
+        if fallback:
+            _note_fallback()
+        return value
+        
+    @contextmanager
+    def _client(self, method):
+        """
+        Check out a pytrends client, failing at once while the circuit refuses calls.
+        
+        Args:
+            method (str): First pytrends method that will be called, counted if refused
+        """
+        try:
+            self.breaker.check()
+        except CircuitOpenError:
+            UPSTREAM_CALLS.inc(method=method, outcome='rejected')
+            raise
+        with self.pool.client() as client:
+            yield client
+            
+    def _upstream(self, client, method, *args, **kwargs):
+        """Call a pytrends method through the circuit breaker and the rate limiter."""
+        def attempt():
+            waited = self.limiter.acquire()
+            RATE_LIMIT_WAIT.observe(waited, priority=PRIORITY_NAMES[current_priority()])
+            start = time.perf_counter()
+            try:
+                return getattr(client, method)(*args, **kwargs)
+            finally:
+                UPSTREAM_DURATION.observe(time.perf_counter() - start, method=method)
+                
+        try:
+            # The token is taken inside the breaker, so refused calls do not spend the budget
+            result = self.breaker.call(attempt)
+        except CircuitOpenError:
+            UPSTREAM_CALLS.inc(method=method, outcome='rejected')
+            raise
+        except Exception:
+            UPSTREAM_CALLS.inc(method=method, outcome='error')
+            raise
+        UPSTREAM_CALLS.inc(method=method, outcome='success')
+        return result
+        
+    def data_version(self):
+        """
+        Token that changes whenever the data behind the trends endpoints may have changed.
+        
+        It changes on every cache or history write, and at least once per
+        shortest cache TTL, so an expired result is not hidden behind 304s
+        until it is requested again. Used for ETags before running a view.
+        
+        Returns:
+            str: The version, or None without a cache, while degraded, or once
+            the current fallback_scope was served a fallback, since mock data
+            changes on every call (ETags then hash the body)
+        """
+        if self.cache is None or self.degraded or served_fallback():
+            return None
+        window = int(time.time() // min(self.cache.ttls.values()))
+        history = self.history.generation if self.history is not None else 0
+        return f"{self._instance_id}:{self.cache.generation}:{history}:{window}"
+        
+    @property
+    def degraded(self):
+        """True while answers may come from mock data or stale cache instead of Google."""
+        return not self.api_available or self.breaker.state != CircuitBreaker.CLOSED
+        
+    def _flight_key(self, endpoint, keywords, geo='', timeframe='', category=0):
+        """Identity of a request for coalescing and refresh queueing."""
+        return (endpoint,) + tuple(
+            tuple(v) if isinstance(v, list) else v
+            for v in TrendsCache.normalize(keywords, geo, timeframe, category)
+        )
+        
+    def refresh_search_trends(self, keywords, geo='', timeframe='today 3-m', category=0):
+        """Fetch search results upstream and update the cache, ignoring any cached copy."""
+        keywords = self._clean_keywords(keywords)
+        key = self._flight_key('search', keywords, geo, timeframe, category)
+        return self._flights.do(key, lambda: self._fetch_search_trends(keywords, geo, timeframe, category))[0]
+        
+    def refresh_regional_trends(self, region, category=0, resolution='COUNTRY'):
+        """Fetch regional trends upstream and update the cache, ignoring any cached copy."""
+        key = self._flight_key('regional', [], region, resolution, category)
+        return self._flights.do(key, lambda: self._fetch_regional_trends(region, category, resolution))[0]
+        
     def get_current_trends(self, geo='', category=0):
         """Get current trending topics with fallback to mock data."""
+        return self._coalesced(
+            'current', [], lambda: self._fetch_current_trends(geo, category),
+            geo=geo, category=category
+        )
+        
+    def _fetch_current_trends(self, geo='', category=0):
+        """
+        Fetch current trending topics upstream.
+        
+        Returns:
+            tuple: (trending topics, True if any part is a fallback)
+        """
         if not self.api_available:
             print("Using mock trending topics (API not available)")
-            return self._get_mock_trending_topics()
+            MOCK_FALLBACKS.inc(kind='trending')
+            return self._get_mock_trending_topics(), True
             
         try:
-            trending_searches_df = self.pytrends.trending_searches(pn=geo if geo else 'united_states')
+            with self._client('trending_searches') as pytrends:
+                trending_searches_df = self._upstream(pytrends, 'trending_searches', pn=geo if geo else 'united_states')
             
             # Format results
             trending_topics = trending_searches_df[0].tolist()
             
-            # Get more details for each trending topic
-            results = []
-            for topic in trending_topics[:10]:  # Limit to top 10 to avoid API rate limits
-                details = self._get_topic_details(topic, geo, category)
-                results.append({
-                    'topic': topic,
-                    'details': details
-                })
+            # Get more details for the top trending topics, five per upstream call
+            top_topics = trending_topics[:10]  # Limit to top 10 to avoid API rate limits
+            details, fallback = self._get_topics_details(top_topics, geo, category)
+            results = [{'topic': topic, 'details': details[topic]} for topic in top_topics]
                 
-            return results
+            if not fallback:
+                self._store('current', [], results, geo=geo, category=category)
+            return results, fallback
         except Exception as e:
             print(f"Error fetching current trends: {e}")
-            return self._get_mock_trending_topics()
+            MOCK_FALLBACKS.inc(kind='trending')
+            return self._get_mock_trending_topics(), True
         
     def search_trends(self, keywords, geo='', timeframe='today 3-m', category=0):
-        """Search for specific keywords with fallback to mock data."""
+        """
+        Search for specific keywords with fallback to mock data.
+        
+        Any number of keywords is supported: more than five are fetched in
+        anchored batches and put on one comparable scale, see _fetch_anchored.
+        Keywords that could not be put on that scale are listed in 'unscaled'.
+        """
+        keywords = self._clean_keywords(keywords)
+        return self._coalesced(
+            'search', keywords, lambda: self._fetch_search_trends(keywords, geo, timeframe, category),
+            geo=geo, timeframe=timeframe, category=category
+        )
+        
+    def _clean_keywords(self, keywords):
+        """Drop blanks and duplicates, a payload cannot hold the same keyword twice."""
+        return list(dict.fromkeys(k.strip() for k in keywords if k and k.strip()))
+        
+    def _fetch_search_trends(self, keywords, geo='', timeframe='today 3-m', category=0):
+        """
+        Fetch interest over time and related data for the keywords upstream.
+        
+        Returns:
+            tuple: (search results, True if they are mock data)
+        """
         if not self.api_available:
             print("Using mock search results (API not available)")
-            return self._get_mock_search_results(keywords)
+            MOCK_FALLBACKS.inc(kind='search')
+            return self._get_mock_search_results(keywords), True
             
         try:
-            # Ensure we don't exceed the maximum of 5 keywords
-            keywords = keywords[:5]
-            
-            # Build the payload
-            self.pytrends.build_payload(keywords, cat=category, timeframe=timeframe, geo=geo)
+            fetched, interest_over_time_df, unscaled = self._fetch_anchored(
+                lambda batch: self._fetch_payload(batch, geo, timeframe, category),
+                keywords, frame_of=lambda payload: payload[0]
+            )
             
-            # Get the data
-            interest_over_time_df = self.pytrends.interest_over_time()
-            related_topics = self.pytrends.related_topics()
-            related_queries = self.pytrends.related_queries()
+            # The anchor is in every batch, keep its related data from the first one
+            related_topics, related_queries = {}, {}
+            for _, topics, queries in fetched:
+                for keyword, data in topics.items():
+                    related_topics.setdefault(keyword, data)
+                for keyword, data in queries.items():
+                    related_queries.setdefault(keyword, data)
             
             # Process and structure the data
             result = {
@@ -87,12 +388,283 @@ class TrendsService:
                 'related_topics': self._process_related_topics(related_topics),
                 'related_queries': self._process_related_queries(related_queries)
             }
+            if unscaled:
+                result['unscaled'] = unscaled
             
-            return result
+            self._store('search', keywords, result, geo=geo, timeframe=timeframe, category=category)
+            return result, False
         except Exception as e:
             print(f"Error searching trends: {e}")
-            return self._get_mock_search_results(keywords)
+            MOCK_FALLBACKS.inc(kind='search')
+            return self._get_mock_search_results(keywords), True
+            
+    def _map_batches(self, fetch, batches):
+        """Fetch independent batches side by side within the client pool, in the caller's traffic class."""
+        if len(batches) == 1:
+            return [fetch(batches[0])]
+        priority = current_priority()
+        
+        def fetch_batch(batch):
+            with traffic_class(priority):
+                return fetch(batch)
+                
+        with ThreadPoolExecutor(max_workers=min(len(batches), self.pool.size)) as executor:
+            return list(executor.map(fetch_batch, batches))
+            
+    def _fetch_payload(self, keywords, geo='', timeframe='today 3-m', category=0):
+        """Fetch interest over time, related topics and related queries for one payload."""
+        with self._client('build_payload') as pytrends:
+            self._upstream(pytrends, 'build_payload', keywords, cat=category, timeframe=timeframe, geo=geo)
+            return (
+                self._upstream(pytrends, 'interest_over_time'),
+                self._upstream(pytrends, 'related_topics'),
+                self._upstream(pytrends, 'related_queries')
+            )
+            
+    def _fetch_anchored(self, fetch, keywords, frame_of=lambda result: result):
+        """
+        Fetch any number of keywords in payloads of five and merge their interest.
+        
+        The first five keywords are fetched as a probe. Its keyword with the
+        most interest becomes the anchor, so the anchor reads well above zero
+        in the other payloads, which each hold it plus up to four other keywords.
+        A probe with no interest at all (or no data) is zero on every scale,
+        and the remaining keywords are anchored among themselves.
         
+        Args:
+            fetch (callable): Fetches one payload for a list of keywords
+            keywords (list): All keywords, without duplicates
+            frame_of (callable): Returns the interest_over_time DataFrame of a fetch result
+            
+        Returns:
+            tuple: (fetch results with the probe first, merged DataFrame,
+            unscaled keywords), see _merge_anchored
+        """
+        probe = fetch(keywords[:MAX_KEYWORDS_PER_PAYLOAD])
+        frame = frame_of(probe).drop(columns=['isPartial'], errors='ignore')
+        if len(keywords) <= MAX_KEYWORDS_PER_PAYLOAD:
+            return [probe], frame, []
+            
+        # Google answers an empty frame when none of the keywords has interest
+        totals = frame.astype(float).sum()
+        if frame.empty or totals.max() <= 0:
+            results, merged, unscaled = self._fetch_anchored(fetch, keywords[MAX_KEYWORDS_PER_PAYLOAD:], frame_of)
+            if not merged.empty:
+                merged = merged.reindex(columns=keywords, fill_value=0)
+            return [probe] + results, merged, unscaled
+            
+        anchor = totals.idxmax()
+        results = [probe] + self._map_batches(fetch, self._anchor_batches(anchor, keywords[MAX_KEYWORDS_PER_PAYLOAD:]))
+        merged, unscaled = self._merge_anchored([frame_of(result) for result in results], keywords, anchor)
+        return results, merged, unscaled
+        
+    def _anchor_batches(self, anchor, others):
+        """Split keywords into the fewest payloads that each hold the anchor plus up to four of them."""
+        size = MAX_KEYWORDS_PER_PAYLOAD - 1
+        return [[anchor] + others[i:i + size] for i in range(0, len(others), size)]
+        
+    def _merge_anchored(self, frames, keywords, anchor):
+        """
+        Combine the interest over time of anchored batches on one 0-100 scale.
+        
+        Each payload is scaled by Google to its own peak, so the same anchor
+        reads differently in each batch. Every batch is multiplied by the ratio
+        of the anchor's total in the first batch to its total in that batch, then
+        all series are rescaled together so the overall peak is 100.
+        
+        An anchor that reads zero in a batch means something there dwarfs it,
+        and the batch has no known ratio to the others. Its keywords keep the
+        batch's own 0-100 scale and are returned as unscaled instead.
+        
+        Args:
+            frames (list): interest_over_time DataFrames, the probe first, the anchor in each
+            keywords (list): All keywords
+            anchor (str): Keyword present in every frame, with interest in the first one
+            
+        Returns:
+            tuple: (DataFrame with one integer column per keyword in keyword order,
+            list of unscaled keywords)
+        """
+        frames = [df.drop(columns=['isPartial'], errors='ignore') for df in frames]
+        if any(df.empty for df in frames):
+            return pd.DataFrame(), []
+            
+        reference = frames[0][anchor].astype(float).sum()
+        parts, unscaled_parts = [frames[0].astype(float)], []
+        for df in frames[1:]:
+            values = df.astype(float)
+            anchor_total = values[anchor].sum()
+            own = values.drop(columns=[anchor])
+            if anchor_total > 0:
+                parts.append(own * (reference / anchor_total))
+            elif not own.to_numpy().any():
+                # Nothing in the batch has interest, zero on any scale
+                parts.append(own)
+            else:
+                unscaled_parts.append(own)
+                
+        merged = pd.concat(parts, axis=1).fillna(0.0)
+        peak = merged.to_numpy().max()
+        if peak > 0:
+            merged = merged * (100.0 / peak)
+        unscaled = []
+        if unscaled_parts:
+            unscaled_df = pd.concat(unscaled_parts, axis=1)
+            unscaled = [k for k in keywords if k in unscaled_df.columns]
+            print(f"Warning: no common scale for {unscaled}, the anchor {anchor!r} reads zero beside them")
+            merged = pd.concat([merged, unscaled_df], axis=1).fillna(0.0)
+        return merged.round().astype(int)[[k for k in keywords if k in merged.columns]], unscaled
+        
+    def get_history(self, keywords, geo='', timeframe='today 5-y', category=0):
+        """
+        Get weekly interest over a long window from the local history store.
+        
+        Only the weeks the store is missing are fetched, usually the newest
+        few, and nothing at all while the stored weeks are recent enough.
+        Windows that are not weekly (shorter than nine months, longer than
+        five years, custom dates) and categories go through search_trends.
+        Related topics and queries come from the search cache when present.
+        """
+        keywords = self._clean_keywords(keywords)
+        window = self._history_window(timeframe)
+        if self.history is None or window is None or category or not keywords:
+            return self.search_trends(keywords, geo, timeframe, category)
+            
+        def fetch():
+            # Followers of the flight must learn about a mock fallback from search_trends too
+            with fallback_scope() as scope:
+                result = self._fetch_history(keywords, geo, timeframe, window)
+            return result, scope.fallback
+            
+        key = self._flight_key('history', keywords, geo, timeframe, category)
+        result, fallback = self._flights.do(key, fetch)
+        if fallback:
+            _note_fallback()
+        return result
+        
+    def _history_window(self, timeframe):
+        """Return the first and last week of a weekly 'today N-y' / 'today N-m' timeframe, or None."""
+        match = re.fullmatch(r'today (\d+)-([ym])', (timeframe or '').strip())
+        if not match:
+            return None
+        count, unit = int(match.group(1)), match.group(2)
+        today = pd.Timestamp.today().normalize()
+        start = today - (pd.DateOffset(years=count) if unit == 'y' else pd.DateOffset(months=count))
+        # Google answers with daily points below ~9 months and monthly ones above 5 years
+        if (today - start).days < 270 or (today - start).days > 5 * 366:
+            return None
+        return week_start(start), week_start(today)
+        
+    def _fetch_history(self, keywords, geo, timeframe, window):
+        """Bring the stored history up to date if needed and return it on one scale."""
+        start, end = window
+        coverage = self.history.coverage(keywords, geo)
+        factors = self.history.factors(keywords, geo)
+        
+        missing_head = [k for k in keywords if k not in coverage or coverage[k][0] > start + pd.Timedelta(days=7)]
+        up_to_date = not missing_head and factors is not None and all(
+            coverage[k][1] >= end - pd.Timedelta(days=7) and time.time() - coverage[k][2] < HISTORY_TTL
+            for k in keywords
+        )
+        
+        if not up_to_date and self.api_available:
+            if missing_head:
+                fetch_start = start
+            else:
+                fetch_start = min(coverage[k][1] for k in keywords) - pd.Timedelta(weeks=HISTORY_OVERLAP_WEEKS)
+            try:
+                factors = self._update_history(keywords, geo, max(fetch_start, start), coverage)
+            except Exception as e:
+                print(f"Error updating history: {e}")
+                
+        stored = self.history.read(keywords, geo, start, end)
+        if stored.empty or stored.isna().all().all():
+            return self.search_trends(keywords, geo, timeframe)
+            
+        # Back from each keyword's stored scale to the common scale of the group
+        factors = factors or {}
+        scaled = stored / pd.Series({k: factors.get(k, 1.0) for k in keywords})
+        peak = scaled.max().max()
+        if peak > 0:
+            scaled = scaled * (100.0 / peak)
+        interest = scaled.fillna(0).round().astype(int)
+        
+        cached = self._cached('search', keywords, geo=geo, timeframe=timeframe)
+        related = cached[0] if cached is not None else {}
+        return {
+            'interest_over_time': self._process_interest_over_time(interest),
+            'related_topics': related.get('related_topics', {}),
+            'related_queries': related.get('related_queries', {})
+        }
+        
+    def _update_history(self, keywords, geo, fetch_start, coverage):
+        """
+        Fetch the keywords from fetch_start to today and merge them into the store.
+        
+        Each keyword's new weeks are rescaled to its stored scale by the ratio
+        of its stored to fetched totals over the weeks both have. A keyword
+        with nothing to compare against starts a new stored scale, which
+        needs a fetch covering everything stored for it: if this one starts
+        later, the whole stored range is fetched again instead.
+        
+        Returns:
+            dict: keyword -> factor from the fetched common scale to the stored scale
+        """
+        today = pd.Timestamp.today().normalize()
+        timeframe = f"{fetch_start:%Y-%m-%d} {today:%Y-%m-%d}"
+        _, fetched, unscaled = self._fetch_anchored(
+            lambda batch: self._fetch_interest(batch, geo, timeframe), keywords
+        )
+        if fetched.empty:
+            raise ValueError(f"No interest data returned for {timeframe}")
+        if unscaled:
+            # Their factors to the group's scale would be made up
+            raise ValueError(f"No common scale for {unscaled}")
+        fetched = to_weekly(fetched)
+        
+        complete_until = min(fetched.index.max(), week_start(today) - pd.Timedelta(days=7))
+        stored = self.history.read(keywords, geo, fetched.index.min(), fetched.index.max())
+        writes, unlinked = {}, []
+        for keyword in keywords:
+            series = fetched[keyword]
+            if keyword not in coverage:
+                writes[keyword] = (1.0, True, series)
+                continue
+            first, done_until, _ = coverage[keyword]
+            new = series[(series.index < first) | (series.index > done_until)]
+            # Only complete weeks are compared, the partial last week may still move
+            known = stored[keyword].dropna()
+            known = known[known.index <= done_until]
+            common = known.index.intersection(series.index)
+            stored_total, fetched_total = known[common].sum(), series[common].sum()
+            if stored_total > 0 and fetched_total > 0:
+                writes[keyword] = (stored_total / fetched_total, False, new)
+            elif not self.history.read([keyword], geo)[keyword].fillna(0).any():
+                # All that is stored is zeros, which are zeros on every scale
+                writes[keyword] = (1.0, False, new)
+            elif fetch_start <= first:
+                writes[keyword] = (1.0, True, series)
+            else:
+                unlinked.append(keyword)
+                
+        if unlinked:
+            # Replacing them from fetch_start on would drop their earlier stored weeks
+            return self._update_history(keywords, geo, min(coverage[k][0] for k in unlinked), coverage)
+            
+        factors = {}
+        for keyword, (factor, replace, new) in writes.items():
+            self.history.write(keyword, geo, new * factor, complete_until, replace=replace, fetched_from=fetch_start)
+            factors[keyword] = factor
+            
+        self.history.set_factors(keywords, geo, factors)
+        return factors
+        
+    def _fetch_interest(self, keywords, geo='', timeframe='today 5-y'):
+        """Fetch only the interest over time of one payload."""
+        with self._client('build_payload') as pytrends:
+            self._upstream(pytrends, 'build_payload', keywords, timeframe=timeframe, geo=geo)
+            return self._upstream(pytrends, 'interest_over_time')
+            
     def _get_mock_trending_topics(self):
         """Get mocked trending topics for development."""
         # Randomize a bit to simulate different results
@@ -161,9 +733,23 @@ class TrendsService:
     
     def get_regional_trends(self, region, category=0, resolution='COUNTRY'):
         """Get trends for a specific region with fallback to mock data."""
+        # Regional results have no timeframe, the resolution takes its place in the key
+        return self._coalesced(
+            'regional', [], lambda: self._fetch_regional_trends(region, category, resolution),
+            geo=region, timeframe=resolution, category=category
+        )
+        
+    def _fetch_regional_trends(self, region, category=0, resolution='COUNTRY'):
+        """
+        Fetch trending searches and their geographic distribution upstream.
+        
+        Returns:
+            tuple: (regional trends, True if any part is a fallback)
+        """
         if not self.api_available:
             print("Using mock regional trends (API not available)")
-            return self._get_mock_regional_trends(region)
+            MOCK_FALLBACKS.inc(kind='regional')
+            return self._get_mock_regional_trends(region), True
             
         try:
             # For Italian regions, we need to map region names to ISO codes
@@ -177,28 +763,63 @@ class TrendsService:
             # Default to Italy if specific region not found
             geo = geo_mapping.get(region.lower(), 'IT')
             
-            # Get trending searches for the region/country
-            trending_searches = self.get_current_trends(geo=geo, category=category)
+            # Get trending searches for the region/country, mock topics must not be cached here either
+            with fallback_scope() as scope:
+                trending_searches = self.get_current_trends(geo=geo, category=category)
             
             # Get geographical distribution of top trending topic
             if trending_searches:
                 top_topic = trending_searches[0]['topic']
-                self.pytrends.build_payload([top_topic], cat=category, geo=geo)
-                geo_data = self.pytrends.interest_by_region(resolution=resolution)
-                
-                # Process geo data
-                processed_geo_data = self._process_geo_data(geo_data)
+                processed_geo_data = self._fetch_geo_distribution([top_topic], geo, category, resolution)
             else:
                 processed_geo_data = {}
                 
-            return {
+            result = {
                 'trending_searches': trending_searches,
                 'geo_distribution': processed_geo_data
             }
+            if not scope.fallback:
+                self._store('regional', [], result, geo=region, timeframe=resolution, category=category)
+            return result, scope.fallback
         except Exception as e:
             print(f"Error fetching regional trends: {e}")
-            return self._get_mock_regional_trends(region)
+            MOCK_FALLBACKS.inc(kind='regional')
+            return self._get_mock_regional_trends(region), True
             
+    def get_geo_distribution(self, topics, geo='', category=0, resolution='COUNTRY'):
+        """
+        Get the interest by region of up to MAX_KEYWORDS_PER_PAYLOAD topics in one upstream payload.
+        
+        Returns:
+            dict: region -> {topic: interest}, empty if the data is unavailable
+        """
+        topics = self._clean_keywords(topics)[:MAX_KEYWORDS_PER_PAYLOAD]
+        if not topics:
+            return {}
+        if not self.api_available:
+            MOCK_FALLBACKS.inc(kind='geo')
+            _note_fallback()
+            return {}
+            
+        def fetch():
+            try:
+                result = self._fetch_geo_distribution(topics, geo, category, resolution)
+                self._store('geo', topics, result, geo=geo, timeframe=resolution, category=category)
+                return result, False
+            except Exception as e:
+                print(f"Error fetching geo distribution: {e}")
+                MOCK_FALLBACKS.inc(kind='geo')
+                return {}, True
+                
+        return self._coalesced('geo', topics, fetch, geo=geo, timeframe=resolution, category=category)
+        
+    def _fetch_geo_distribution(self, topics, geo='', category=0, resolution='COUNTRY'):
+        """Fetch the interest by region of the topics upstream."""
+        with self._client('build_payload') as pytrends:
+            self._upstream(pytrends, 'build_payload', topics, cat=category, geo=geo)
+            geo_data = self._upstream(pytrends, 'interest_by_region', resolution=resolution)
+        return self._process_geo_data(geo_data)
+        
     def _get_mock_regional_trends(self, region):
         """Get mocked regional trends for development."""
         # Get mock trending topics
@@ -230,49 +851,98 @@ class TrendsService:
             'geo_distribution': geo_distribution
         }
     
-    def _get_topic_details(self, topic, geo='', category=0):
-        """Get additional details for a trending topic."""
-        try:
-            self.pytrends.build_payload([topic], cat=category, timeframe='today 1-m', geo=geo)
+    def get_topics_details(self, topics, geo='', category=0):
+        """
+        Get the current interest of up to MAX_KEYWORDS_PER_PAYLOAD topics in one upstream payload.
+        
+        Returns:
+            dict: topic -> {'current_interest', 'rising'}
+        """
+        topics = self._clean_keywords(topics)[:MAX_KEYWORDS_PER_PAYLOAD]
+        if not self.api_available:
+            MOCK_FALLBACKS.inc(kind='details')
+            _note_fallback()
+            return {topic: {'current_interest': 0, 'rising': False} for topic in topics}
+        return self._coalesced(
+            'details', topics, lambda: self._get_topics_details(topics, geo, category, store=True),
+            geo=geo, timeframe='today 1-m', category=category
+        )
+        
+    def _get_topics_details(self, topics, geo='', category=0, store=False):
+        """
+        Get details for several topics, packing up to MAX_KEYWORDS_PER_PAYLOAD per upstream call
+        and fetching the payloads concurrently.
+        
+        Google normalizes a payload so its overall peak is 100, which makes the
+        values of each topic depend on the others it was fetched with. Every
+        column is rescaled so its own peak is 100, the same numbers a solo
+        fetch of the topic returns.
+        
+        Args:
+            topics (list): Topics to look up
+            store (bool): Cache the details of every payload fetched
             
-            # Get interest over time
-            interest_over_time_df = self.pytrends.interest_over_time()
+        Returns:
+            tuple: (topic -> {'current_interest', 'rising'}, True if any payload
+            failed and its topics got zeroed details)
+        """
+        groups = [
+            topics[start:start + MAX_KEYWORDS_PER_PAYLOAD]
+            for start in range(0, len(topics), MAX_KEYWORDS_PER_PAYLOAD)
+        ]
+        if not groups:
+            return {}, False
+        
+        def fetch_group(group):
+            details = {}
+            try:
+                with self._client('build_payload') as pytrends:
+                    self._upstream(pytrends, 'build_payload', group, cat=category, timeframe='today 1-m', geo=geo)
+                    
+                    # Get interest over time
+                    interest_over_time_df = self._upstream(pytrends, 'interest_over_time')
+                    
+                for topic in group:
+                    current_interest = 0
+                    if not interest_over_time_df.empty and topic in interest_over_time_df:
+                        column = interest_over_time_df[topic].astype(float)
+                        peak = column.max()
+                        if peak > 0:
+                            current_interest = int(round(column.iloc[-1] * 100 / peak))
+                    details[topic] = {
+                        'current_interest': current_interest,
+                        'rising': current_interest > 50  # Arbitrary threshold
+                    }
+                if store:
+                    self._store('details', group, details, geo=geo, timeframe='today 1-m', category=category)
+            except Exception as e:
+                print(f"Error getting details for topics {', '.join(group)}: {e}")
+                MOCK_FALLBACKS.inc(kind='details')
+                for topic in group:
+                    details[topic] = {
+                        'current_interest': 0,
+                        'rising': False
+                    }
+                return details, True
+            return details, False
             
-            # Process the data
-            if not interest_over_time_df.empty:
-                interest_data = interest_over_time_df[topic].tolist()
-                current_interest = interest_data[-1] if interest_data else 0
-            else:
-                current_interest = 0
-                
-            return {
-                'current_interest': current_interest,
-                'rising': current_interest > 50  # Arbitrary threshold
-            }
-        except Exception as e:
-            print(f"Error getting details for topic {topic}: {e}")
-            return {
-                'current_interest': 0,
-                'rising': False
-            }
+        # The groups are independent, fetch them side by side
+        details, fallback = {}, False
+        for group_details, group_fallback in self._map_batches(fetch_group, groups):
+            details.update(group_details)
+            fallback = fallback or group_fallback
+        return details, fallback
     
     def _process_interest_over_time(self, df):
         """Process interest over time data."""
         if df.empty:
             return []
             
-        result = []
-        for index, row in df.iterrows():
-            date_str = index.strftime('%Y-%m-%d')
-            data_point = {'date': date_str}
-            
-            for column in df.columns:
-                if column != 'isPartial':
-                    data_point[column] = int(row[column])
-                    
-            result.append(data_point)
-            
-        return result
+        # One conversion per block instead of a Python loop over every cell
+        values = df.drop(columns=['isPartial'], errors='ignore').astype('int64')
+        keys = ['date'] + list(values.columns)
+        dates = pd.DatetimeIndex(values.index).strftime('%Y-%m-%d')
+        return [dict(zip(keys, [date] + row)) for date, row in zip(dates, values.to_numpy().tolist())]
     
     def _process_related_topics(self, related_topics):
         """Process related topics data."""
@@ -311,15 +981,80 @@ class TrendsService:
             return {}
             
         # Convert to dictionary with region as key and interest as value
-        result = {}
-        for index, row in df.iterrows():
-            for column in df.columns:
-                region_name = index
-                interest_value = int(row[column])
-                
-                if region_name not in result:
-                    result[region_name] = {}
-                    
-                result[region_name][column] = interest_value
-                
-        return result 
\ No newline at end of file
+        values = df.astype('int64')
+        if not values.index.is_unique:
+            # Repeated region names used to overwrite each other, keep the last
+            values = values.groupby(level=0, sort=False).last()
+        return values.to_dict('index')
+
+
+_shared_services = {}
+_shared_lock = threading.Lock()
+
+
+def get_trends_service(database_url=None):
+    """
+    Return the TrendsService shared by everything using a database, so it coalesces and caches together.
+    
+    Args:
+        database_url (str): sqlite:/// URL, DATABASE_URL from the environment by default
+    """
+    database_url = database_url or os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+    service = _shared_services.get(database_url)
+    if service is None:
+        # Threads asking at the same time must not each build a service
+        with _shared_lock:
+            service = _shared_services.get(database_url)
+            if service is None:
+                service = _shared_services[database_url] = TrendsService(database_url=database_url)
+    return service
+
+
+def init_trends_service(app):
+    """
+    Attach the shared TrendsService for the app's DATABASE_URL to app.extensions['trends_service'].
+    
+    The blueprints look the service up there, so instance config and
+    test_config decide the database. Each request runs in a fallback_scope.
+    """
+    service = get_trends_service(app.config.get('DATABASE_URL'))
+    app.extensions['trends_service'] = service
+    
+    # Every request is a fallback_scope, so its ETag can tell mock answers apart (see data_version)
+    @app.before_request
+    def open_fallback_scope():
+        g.fallback_scope = fallback_scope()
+        g.fallback_scope.__enter__()
+        
+    @app.teardown_request
+    def close_fallback_scope(error=None):
+        scope = g.pop('fallback_scope', None)
+        if scope is not None:
+            scope.__exit__(None, None, None)
+            
+    return service
+
+
+def _upstream_state():
+    states = {(name,): 0 for name in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN)}
+    for service in list(_shared_services.values()):
+        states[(service.breaker.state,)] += 1
+    return states if _shared_services else {}
+
+
+def _rate_limit_queue():
+    queues = {}
+    for service in list(_shared_services.values()):
+        for name, depth in service.limiter.stats()['queue_depth'].items():
+            queues[(name,)] = queues.get((name,), 0) + depth
+    return queues
+
+
+CIRCUIT_STATE = Gauge(
+    'trends_circuit_state', 'State of the Google Trends circuit breaker (1 for the current state)', ('state',),
+    read=_upstream_state
+)
+RATE_LIMIT_QUEUE = Gauge(
+    'trends_rate_limit_queue_depth', 'Callers waiting for a Google Trends request slot', ('priority',),
+    read=_rate_limit_queue
+)
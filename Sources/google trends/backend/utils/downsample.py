@@ -0,0 +1,89 @@
+import numpy as np
+
+# Fewer points than this would drop the first or last one
+MIN_POINTS = 3
+
+
+def lttb_indices(y, n_out, x=None):
+    """
+    Pick n_out points of a series with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The points in between are
+    split into n_out - 2 buckets and each bucket keeps the point forming the
+    largest triangle with the point kept in the previous bucket and the
+    average of the next one, which preserves peaks and troughs.
+
+    Each bucket only depends on the one before, so buckets are walked in
+    order, with the triangle areas of a bucket computed in one NumPy step.
+
+    Args:
+        y (array-like): Values
+        n_out (int): Number of points to keep
+        x (array-like): Positions (default: evenly spaced)
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < MIN_POINTS:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # Bucket edges over the points between the first and the last
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # Average of every bucket, used as the third triangle point
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        cx, cy = avg_x[b + 1], avg_y[b + 1]
+        # Twice the triangle area, the constant factor does not change the argmax
+        areas = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(areas.argmax())
+        selected[b + 1] = a
+    return selected
+
+
+def downsample_rows(rows, max_points, keys=None):
+    """
+    Reduce interest over time rows to at most max_points rows for charting.
+
+    Every keyword gets an equal share of the budget, and a row is kept if
+    any keyword's LTTB selection keeps it, so each line keeps its own peaks.
+    When a share would be under MIN_POINTS, LTTB runs once on the highest
+    value of each row instead, which keeps the peaks of the lines together.
+
+    Args:
+        rows (list): [{'date': ..., keyword: value, ...}, ...] in date order
+        max_points (int): Maximum number of rows to return, at least MIN_POINTS
+        keys (list): Series to consider (default: every key except 'date')
+
+    Returns:
+        list: The kept rows, in date order
+    """
+    if max_points is not None and max_points < MIN_POINTS:
+        raise ValueError(f"max_points must be at least {MIN_POINTS}, got {max_points}")
+    if not rows or max_points is None or len(rows) <= max_points:
+        return rows
+    keys = keys or [key for key in rows[0] if key != 'date']
+    if not keys:
+        return rows[:max_points]
+
+    values = np.array([[row.get(key, 0) for key in keys] for row in rows], dtype=float)
+    keep = np.zeros(len(rows), dtype=bool)
+    budget = max_points // len(keys)
+    if budget < MIN_POINTS:
+        keep[lttb_indices(values.max(axis=1), max_points)] = True
+    else:
+        # The union of the selections is at most len(keys) * budget <= max_points rows
+        for j in range(len(keys)):
+            keep[lttb_indices(values[:, j], budget)] = True
+    return [row for row, kept in zip(rows, keep) if kept]
@@ -0,0 +1,164 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import g, request
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 512
+
+
+class CompressedBodyCache:
+    """Thread-safe LRU of compressed bodies keyed by (ETag, encoding)."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get_or_create(self, key, create):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+
+        value = create()
+
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return value
+
+
+def compress_body(body, encoding):
+    """Compress a response body with the negotiated content encoding."""
+    if encoding == 'br':
+        return brotli.compress(body)
+    # mtime=0 keeps the gzip output identical for identical bodies
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def etag_from_data(view):
+    """
+    Mark a view whose response depends only on the request and the app's data version.
+    
+    Its ETag is computed before the view runs, so a matching If-None-Match
+    is answered with 304 without doing the work.
+    """
+    view.etag_from_data = True
+    return view
+
+
+def no_http_cache(view):
+    """Mark a view whose body never repeats (counters, metrics), so it is neither tagged nor cached."""
+    view.no_http_cache = True
+    return view
+
+
+def negotiate_encoding():
+    """Return the content encoding the client prefers ('br' or 'gzip'), or None."""
+    if not request.accept_encodings:
+        return None
+    return request.accept_encodings.best_match(['br', 'gzip'] if brotli else ['gzip'])
+
+
+def encoded_etag(digest, encoding):
+    """Strong ETag of one representation: every content encoding gets its own."""
+    return f"{digest}-{encoding}" if encoding else digest
+
+
+def init_http_cache(app, max_entries=256, data_version=None):
+    """
+    Add strong ETags, 304 handling and cached compression to GET responses [BE-01].
+    
+    Views marked with etag_from_data get an ETag from the request and
+    data_version() before they run, so revalidating an unchanged result costs
+    no view work. Other responses are tagged by a hash of the request path
+    and parameters and the body. Views marked with no_http_cache are left
+    alone. Register after CORS so the CORS headers are added to 304 responses too.
+    
+    Args:
+        app (Flask): Application to install the hooks on
+        max_entries (int): Number of compressed bodies kept in memory
+        data_version (callable): Returns a token that changes whenever the data
+            behind etag_from_data views may change, or None to hash the body
+    """
+    body_cache = CompressedBodyCache(max_entries)
+    
+    def view_flag(name):
+        view = app.view_functions.get(request.endpoint)
+        return getattr(view, name, False)
+        
+    def not_modified(response, etag):
+        # Turn the response into a 304 in place, keeping headers set by other hooks
+        response.status_code = 304
+        response.set_data(b'')
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+        
+    def data_etag():
+        # ETag of an etag_from_data view for the current data version, None if there is none
+        version = data_version()
+        if version is None:
+            return None
+        # The negotiated format (Accept) is part of the representation too
+        digest = hashlib.sha1(request.full_path.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(request.headers.get('Accept', '').encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(version.encode('utf-8'))
+        return encoded_etag(digest.hexdigest(), negotiate_encoding())
+        
+    @app.before_request
+    def conditional_request():
+        if (request.method not in ('GET', 'HEAD') or data_version is None
+                or not view_flag('etag_from_data')):
+            return None
+        g.data_tagged = True
+        etag = data_etag()
+        if etag is not None and request.if_none_match.contains(etag):
+            response = app.response_class()
+            response.vary.add('Accept')
+            return not_modified(response, etag)
+        return None
+    
+    @app.after_request
+    def conditional_response(response):
+        data_tagged = g.pop('data_tagged', False)
+        if (request.method not in ('GET', 'HEAD') or response.status_code != 200
+                or response.is_streamed or response.direct_passthrough
+                or 'Content-Encoding' in response.headers or view_flag('no_http_cache')):
+            return response
+            
+        body = response.get_data()
+        negotiated = negotiate_encoding()
+        # Taken after the view, which may itself have written the data it returns
+        etag = data_etag() if data_tagged else None
+        if etag is None:
+            digest = hashlib.sha1(request.full_path.encode('utf-8'))
+            digest.update(b'\0')
+            digest.update(body)
+            etag = encoded_etag(digest.hexdigest(), negotiated)
+            if request.if_none_match.contains(etag):
+                return not_modified(response, etag)
+                
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        # Clients may keep the body but must revalidate it on every use
+        response.headers['Cache-Control'] = 'no-cache'
+        
+        encoding = negotiated if len(body) >= MIN_COMPRESS_SIZE else None
+        if encoding:
+            response.set_data(body_cache.get_or_create((etag, encoding), lambda: compress_body(body, encoding)))
+            response.headers['Content-Encoding'] = encoding
+            
+        return response
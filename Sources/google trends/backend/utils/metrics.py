@@ -0,0 +1,170 @@
+import time
+import bisect
+import threading
+from flask import g, request
+from utils.http_cache import no_http_cache
+
+# Upper bounds in seconds, from fast cache hits to rate limited upstream calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base of the metric types: a name, help text and a fixed set of label names."""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(Metric):
+    """Monotonic count, e.g. of upstream calls."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(Metric):
+    """Distribution of observed values (durations) over fixed buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # Per bucket counts (the last one is +Inf), sum, count
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, (list(e[0]), e[1], e[2])) for key, e in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge(Metric):
+    """Current value read at scrape time from a callback returning {label values: value}."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), read=None):
+        super().__init__(name, documentation, labelnames)
+        self.read = read
+
+    def _samples(self):
+        try:
+            values = self.read() if self.read else {}
+        except Exception as e:
+            print(f"Error reading gauge {self.name}: {e}")
+            return []
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+def render_metrics():
+    """Return every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests handled', ('endpoint', 'method', 'status')
+)
+HTTP_DURATION = Histogram(
+    'http_request_duration_seconds', 'Time to produce an HTTP response', ('endpoint', 'method')
+)
+
+
+def init_metrics(app):
+    """
+    Time every request and serve all metrics on /metrics [BE-09].
+
+    Requests are labelled by URL rule rather than path, so labels stay few.
+    Register before the other after_request hooks so their time is included.
+
+    Args:
+        app (Flask): Application to instrument
+    """
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            HTTP_DURATION.observe(time.perf_counter() - start, endpoint=endpoint, method=request.method)
+            HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        return response
+
+    @app.route('/metrics')
+    @no_http_cache
+    def metrics():
+        return app.response_class(render_metrics(), content_type=CONTENT_TYPE)
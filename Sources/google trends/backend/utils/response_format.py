@@ -0,0 +1,77 @@
+from flask import request
+
+# Vendor media type for the columnar time series shape
+COLUMNAR_MEDIA_TYPE = 'application/vnd.trends.columnar+json'
+
+
+def _accepted(media_type):
+    """Return the quality and parameters of an exact media type in the Accept header."""
+    for value, quality in request.accept_mimetypes:
+        base, _, params = value.partition(';')
+        if base.strip().lower() == media_type:
+            return quality, params.replace(' ', '').lower()
+    return 0, ''
+
+
+def negotiate_series_format():
+    """
+    Pick the time series shape requested by the client [BE-01].
+
+    Columnar is chosen with ?format=columnar or an Accept header that ranks
+    COLUMNAR_MEDIA_TYPE above application/json (wildcards keep the row format).
+    Delta encoding is added with ?delta=1 or 'encoding=delta' on the media type.
+
+    Returns:
+        tuple: (columnar, delta) booleans, (False, False) for the default row format
+    """
+    columnar_quality, params = _accepted(COLUMNAR_MEDIA_TYPE)
+    requested = request.args.get('format', '').lower()
+    if requested:
+        columnar = requested == 'columnar'
+    else:
+        columnar = columnar_quality > 0 and columnar_quality > _accepted('application/json')[0]
+    if not columnar:
+        return False, False
+
+    delta = request.args.get('delta', '').lower() in ('1', 'true', 'yes') or 'encoding=delta' in params
+    return True, delta
+
+
+def to_columnar(rows, delta=False):
+    """
+    Convert interest over time rows to one dates array plus one array per keyword.
+
+    Args:
+        rows (list): [{'date': 'YYYY-MM-DD', keyword: value, ...}, ...]
+        delta (bool): Store each series as its first value followed by differences
+
+    Returns:
+        dict: {'dates': [...], 'series': {keyword: [...]}, 'encoding': 'delta' or 'none'}
+    """
+    keywords = [key for key in rows[0] if key != 'date'] if rows else []
+    series = {keyword: [row.get(keyword, 0) for row in rows] for keyword in keywords}
+    if delta:
+        series = {
+            keyword: values[:1] + [b - a for a, b in zip(values, values[1:])]
+            for keyword, values in series.items()
+        }
+    return {
+        'dates': [row['date'] for row in rows],
+        'series': series,
+        'encoding': 'delta' if delta else 'none'
+    }
+
+
+def format_search_results(results):
+    """
+    Reshape search results for the negotiated format, leaving the input untouched.
+
+    Returns:
+        tuple: (results, mimetype) to send
+    """
+    columnar, delta = negotiate_series_format()
+    if not columnar:
+        return results, 'application/json'
+    formatted = dict(results)
+    formatted['interest_over_time'] = to_columnar(results.get('interest_over_time', []), delta)
+    return formatted, COLUMNAR_MEDIA_TYPE
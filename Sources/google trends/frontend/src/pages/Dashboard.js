@@ -1,5 +1,5 @@
-import React from 'react';
-import { useQuery } from 'react-query';
+import React, { useEffect } from 'react';
+import { useQuery, useQueryClient } from 'react-query';
 import { 
   Typography, 
   Grid, 
@@ -14,16 +14,28 @@ import {
   ListItemText,
   Chip,
   Paper,
-  Divider
+  Divider,
+  Alert
 } from '@mui/material';
-import { TrendingUp, ArrowUpward } from '@mui/icons-material';
+import { TrendingUp, ArrowUpward, Lightbulb, Public } from '@mui/icons-material';
 import apiService from '../services/api';
 
 const Dashboard = () => {
-  // Fetch current trends
-  const { data: trendData, isLoading, error } = useQuery(
-    'currentTrends', 
-    () => apiService.trends.getCurrent({ geo: 'IT' }).then(res => res.data)
+  const queryClient = useQueryClient();
+
+  // Reload the dashboard when the server reports a change in the trends
+  useEffect(() => {
+    const source = apiService.trends.stream({ geo: 'IT' });
+    source.addEventListener('diff', () => queryClient.invalidateQueries('dashboard'));
+    // Sent once when Google Trends becomes unavailable or comes back
+    source.addEventListener('status', () => queryClient.invalidateQueries('dashboard'));
+    return () => source.close();
+  }, [queryClient]);
+
+  // Fetch trends, suggestions and regional data in one round trip
+  const { data: dashboardData, isLoading, error } = useQuery(
+    'dashboard', 
+    () => apiService.dashboard.get({ geo: 'IT', suggestions: 3 }).then(res => res.data)
   );
 
   // Handle loading state
@@ -56,8 +68,16 @@ const Dashboard = () => {
     );
   }
 
-  // Get trends if data exists
-  const trends = trendData?.data || [];
+  // Get dashboard sections if data exists
+  const trends = dashboardData?.data?.trends || [];
+  const suggestions = dashboardData?.data?.suggestions || [];
+  const regional = dashboardData?.data?.regional || {};
+  const regions = Object.entries(regional.geo_distribution || {})
+    .map(([region, values]) => ({
+      region,
+      interest: Math.max(0, ...Object.values(values))
+    }))
+    .sort((a, b) => b.interest - a.interest);
 
   return (
     <Box sx={{ mt: 3 }}>
@@ -74,6 +94,12 @@ const Dashboard = () => {
         </Button>
       </Box>
 
+      {dashboardData?.data?.degraded && (
+        <Alert severity="warning" sx={{ mb: 3 }}>
+          Google Trends is currently unavailable, some data may be outdated or simulated.
+        </Alert>
+      )}
+
       <Grid container spacing={4}>
         {/* Trending Topics Card */}
         <Grid item xs={12} md={6}>
@@ -156,6 +182,66 @@ const Dashboard = () => {
           </Card>
         </Grid>
 
+        {/* Content Suggestions Card */}
+        <Grid item xs={12} md={6}>
+          <Card>
+            <CardHeader 
+              title="Content Ideas" 
+              subheader="From today's trends"
+              avatar={<Lightbulb color="primary" />}
+            />
+            <Divider />
+            <CardContent>
+              {suggestions.length > 0 ? (
+                <List>
+                  {suggestions.map((suggestion, index) => (
+                    <ListItem key={index}>
+                      <ListItemText
+                        primary={suggestion.content}
+                        secondary={`${suggestion.topic} · ${suggestion.analytics?.estimated_engagement || 'Unknown'} engagement`}
+                      />
+                    </ListItem>
+                  ))}
+                </List>
+              ) : (
+                <Typography variant="body1" color="text.secondary">
+                  No content ideas available
+                </Typography>
+              )}
+            </CardContent>
+          </Card>
+        </Grid>
+
+        {/* Regional Distribution Card */}
+        <Grid item xs={12} md={6}>
+          <Card>
+            <CardHeader 
+              title="Where Topics Are Trending" 
+              subheader={(regional.topics || []).join(', ')}
+              avatar={<Public color="primary" />}
+            />
+            <Divider />
+            <CardContent>
+              {regions.length > 0 ? (
+                <List>
+                  {regions.slice(0, 5).map((item) => (
+                    <ListItem key={item.region}>
+                      <ListItemText
+                        primary={item.region}
+                        secondary={`Peak interest: ${item.interest}`}
+                      />
+                    </ListItem>
+                  ))}
+                </List>
+              ) : (
+                <Typography variant="body1" color="text.secondary">
+                  No regional data available
+                </Typography>
+              )}
+            </CardContent>
+          </Card>
+        </Grid>
+
         {/* Additional Stats */}
         <Grid item xs={12}>
           <Paper sx={{ p: 3 }}>
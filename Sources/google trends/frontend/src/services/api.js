@@ -33,6 +33,17 @@ const apiService = {
     // Get historical trend data
     getHistory: (params = {}) => {
       return api.get('/trends/history', { params });
+    },
+    
+    // Get upstream health (degraded while Google Trends is unavailable)
+    getStatus: () => {
+      return api.get('/trends/status');
+    },
+    
+    // Subscribe to live trend changes (server-sent 'snapshot', 'diff' and 'status' events)
+    stream: (params = {}) => {
+      const query = new URLSearchParams(params).toString();
+      return new EventSource(`${BASE_URL}/trends/stream${query ? `?${query}` : ''}`);
     }
   },
   
@@ -52,6 +63,14 @@ const apiService = {
     generateTrendingSuggestions: (params = {}) => {
       return api.get('/content/suggestions/trending', { params });
     }
+  },
+  
+  // Dashboard API
+  dashboard: {
+    // Get trends, content suggestions and regional distribution in one call
+    get: (params = {}) => {
+      return api.get('/dashboard', { params });
+    }
   }
 };
 
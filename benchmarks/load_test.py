@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP Load Test Harness
+----------------------
+Starts one of the Flask services on a local threaded WSGI server and replays a
+weighted mix of requests from concurrent clients, then reports throughput and
+p50/p95/p99 latency per endpoint. Results are saved as JSON so runs can be
+compared over time.
+
+Targets:
+    infographic  Scripts/app.py (needs a Master.csv, see --data-file)
+    trends       Google Trends API blueprints, with pytrends replaced by an
+                 offline stand-in that answers with synthetic data after a
+                 configurable delay
+
+Usage:
+    python benchmarks/load_test.py trends --concurrency 16 --duration 30
+    python benchmarks/load_test.py infographic --data-file Master.csv --mix my_mix.json
+
+A mix file is a JSON list of {"weight", "method", "path", "body"} entries.
+"""
+
+import argparse
+import http.client
+import importlib.util
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INFOGRAPHIC_APP = REPO_ROOT / "Scripts" / "app.py"
+TRENDS_BACKEND = REPO_ROOT / "Sources" / "google trends" / "backend"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+DEFAULT_MIXES = {
+    'infographic': [
+        {'weight': 4, 'method': 'GET', 'path': '/'},
+        {'weight': 4, 'method': 'GET', 'path': '/api/charts'},
+        {'weight': 2, 'method': 'GET', 'path': '/api/charts/INS_FA'},
+    ],
+    'trends': [
+        {'weight': 3, 'method': 'GET', 'path': '/api/trends/current?geo=IT'},
+        {'weight': 4, 'method': 'GET', 'path': '/api/trends/search?keywords=assicurazioni,pensioni&geo=IT'},
+        {'weight': 1, 'method': 'GET', 'path': '/api/trends/geographic/lombardia'},
+        {'weight': 2, 'method': 'GET', 'path': '/api/trends/history?keywords=assicurazioni&geo=IT'},
+        {'weight': 2, 'method': 'POST', 'path': '/api/content/suggestions',
+         'body': {'topic': 'Assicurazioni', 'region': 'IT', 'count': 3}},
+        {'weight': 1, 'method': 'POST', 'path': '/api/content/suggestions/bulk',
+         'body': {'topics': ['Pensioni', 'Risparmio', 'Inflazione'], 'count_per_topic': 1}},
+        {'weight': 1, 'method': 'GET', 'path': '/api/content/suggestions/trending?count=5'},
+        {'weight': 1, 'method': 'GET', 'path': '/api/dashboard?geo=IT'},
+    ],
+}
+
+
+class OfflineTrendReq:
+    """Offline stand-in for pytrends.request.TrendReq.
+
+    Returns synthetic frames shaped like the real ones after a fixed delay,
+    so the benchmark measures our code and not Google's rate limits.
+    """
+
+    latency = 0.05
+    topics = ["Artificial Intelligence", "Renewable Energy", "Cybersecurity", "Blockchain",
+              "Remote Work", "Digital Marketing", "E-commerce", "Virtual Reality",
+              "Cloud Computing", "Data Privacy", "Inflation", "Pensions"]
+
+    def __init__(self, *args, **kwargs):
+        self.kw_list = []
+        self.timeframe = 'today 3-m'
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def build_payload(self, kw_list, cat=0, timeframe='today 5-y', geo='', gprop=''):
+        self._wait()
+        self.kw_list = list(kw_list)
+        self.timeframe = timeframe
+
+    def _dates(self):
+        import pandas as pd
+        today = pd.Timestamp.today().normalize()
+        if '5-y' in self.timeframe:
+            return pd.date_range(end=today, periods=260, freq='W-SUN')
+        parts = self.timeframe.split()
+        if len(parts) == 2 and not parts[0].startswith('today'):
+            # Custom range: daily points up to 270 days, weekly beyond, like Google
+            start, end = pd.Timestamp(parts[0]), pd.Timestamp(parts[1])
+            if (end - start).days <= 270:
+                return pd.date_range(start, end, freq='D')
+            return pd.date_range(start - pd.Timedelta(days=(start.dayofweek + 1) % 7), end, freq='W-SUN')
+        return pd.date_range(end=today, periods=90, freq='D')
+
+    def interest_over_time(self):
+        import numpy as np
+        import pandas as pd
+        self._wait()
+        dates = self._dates()
+        rng = np.random.default_rng(zlib.crc32('\0'.join(self.kw_list).encode('utf-8')))
+        data = {kw: rng.integers(0, 101, len(dates)) for kw in self.kw_list}
+        df = pd.DataFrame(data, index=pd.DatetimeIndex(dates, name='date'))
+        df['isPartial'] = False
+        return df
+
+    def _related(self, column):
+        import pandas as pd
+        self._wait()
+        return {
+            kw: {
+                'top': pd.DataFrame({column: [f"{kw} {i}" for i in range(5)], 'value': [100, 80, 60, 40, 20]}),
+                'rising': pd.DataFrame({column: [f"new {kw} {i}" for i in range(3)], 'value': [300, 200, 150]})
+            }
+            for kw in self.kw_list
+        }
+
+    def related_topics(self):
+        return self._related('topic_title')
+
+    def related_queries(self):
+        return self._related('query')
+
+    def trending_searches(self, pn='united_states'):
+        import pandas as pd
+        self._wait()
+        return pd.DataFrame({0: self.topics})
+
+    def interest_by_region(self, resolution='COUNTRY', inc_low_vol=False, inc_geo_code=False):
+        import numpy as np
+        import pandas as pd
+        self._wait()
+        regions = ["Lombardia", "Lazio", "Toscana", "Piemonte", "Veneto", "Campania", "Sicilia"]
+        rng = np.random.default_rng(len(regions))
+        df = pd.DataFrame({kw: rng.integers(0, 101, len(regions)) for kw in self.kw_list},
+                          index=pd.Index(regions, name='geoName'))
+        return df
+
+
+def install_offline_pytrends(latency):
+    """Make every `from pytrends.request import TrendReq` resolve to the stand-in."""
+    OfflineTrendReq.latency = latency
+    try:
+        import pytrends.request as pytrends_request
+    except ImportError:
+        pytrends_request = types.ModuleType('pytrends.request')
+        sys.modules.setdefault('pytrends', types.ModuleType('pytrends'))
+        sys.modules['pytrends.request'] = pytrends_request
+    pytrends_request.TrendReq = OfflineTrendReq
+
+
+def load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_app(target, args):
+    """Import the target service and return its WSGI app."""
+    if target == 'trends':
+        install_offline_pytrends(args.upstream_latency / 1000)
+        # Start every run with an empty trends cache so results are comparable
+        os.environ['DATABASE_URL'] = 'sqlite:///' + str(Path(tempfile.mkdtemp()) / "trends.db")
+        # The offline upstream has no quota, so only throttle if asked to
+        os.environ.setdefault('TRENDS_RATE_PER_MINUTE', '100000')
+        os.environ.setdefault('TRENDS_RATE_BURST', '1000')
+        sys.path.insert(0, str(TRENDS_BACKEND))
+        # The backend keeps relative paths (e.g. the SQLite file) next to itself
+        os.chdir(TRENDS_BACKEND)
+        return load_module('trends_backend_app', TRENDS_BACKEND / "app.py").app
+
+    module = load_module('infographic_app', INFOGRAPHIC_APP)
+    module.data_cache.filename = str(Path(args.data_file).resolve())
+    if not (INFOGRAPHIC_APP.parent / "templates").exists():
+        # The page template is kept with the other HTML outputs
+        module.app.template_folder = str(REPO_ROOT / "HTML outputs" / "templates")
+    return module.app
+
+
+def start_server(app, host='127.0.0.1'):
+    """Serve the app on a free port from a background thread."""
+    from werkzeug.serving import make_server
+    server = make_server(host, 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def endpoint_name(entry):
+    return f"{entry['method']} {entry['path'].split('?')[0]}"
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def run_load(port, mix, concurrency, duration, total_requests, seed, extra_headers):
+    """Replay the mix from concurrent clients and collect per-endpoint samples."""
+    weights = [entry['weight'] for entry in mix]
+    samples = {endpoint_name(entry): {'latencies': [], 'statuses': {}, 'errors': 0} for entry in mix}
+    lock = threading.Lock()
+    issued = [0]
+    deadline = time.perf_counter() + duration if duration else None
+
+    def next_slot():
+        with lock:
+            if total_requests and issued[0] >= total_requests:
+                return False
+            issued[0] += 1
+        return deadline is None or time.perf_counter() < deadline
+
+    def worker(worker_id):
+        rng = random.Random(seed + worker_id)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        local = {name: ([], {}, 0) for name in samples}
+        while next_slot():
+            entry = rng.choices(mix, weights=weights)[0]
+            name = endpoint_name(entry)
+            body = json.dumps(entry['body']) if entry.get('body') is not None else None
+            headers = dict(extra_headers)
+            if body is not None:
+                headers['Content-Type'] = 'application/json'
+            start = time.perf_counter()
+            try:
+                conn.request(entry['method'], entry['path'], body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                elapsed = time.perf_counter() - start
+                latencies, statuses, errors = local[name]
+                latencies.append(elapsed)
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+            except (OSError, http.client.HTTPException):
+                latencies, statuses, errors = local[name]
+                local[name] = (latencies, statuses, errors + 1)
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        conn.close()
+
+        with lock:
+            for name, (latencies, statuses, errors) in local.items():
+                samples[name]['latencies'].extend(latencies)
+                samples[name]['errors'] += errors
+                for status, count in statuses.items():
+                    samples[name]['statuses'][status] = samples[name]['statuses'].get(status, 0) + count
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples, elapsed):
+    """Turn raw samples into throughput and latency percentiles (ms) per endpoint."""
+    endpoints = {}
+    all_latencies = []
+    for name, data in samples.items():
+        latencies = sorted(data['latencies'])
+        all_latencies.extend(latencies)
+        endpoints[name] = {
+            'requests': len(latencies),
+            'errors': data['errors'],
+            'statuses': {str(k): v for k, v in sorted(data['statuses'].items())},
+            'throughput_rps': len(latencies) / elapsed if elapsed else 0.0,
+            'p50_ms': _ms(percentile(latencies, 50)),
+            'p95_ms': _ms(percentile(latencies, 95)),
+            'p99_ms': _ms(percentile(latencies, 99)),
+        }
+    all_latencies.sort()
+    overall = {
+        'requests': len(all_latencies),
+        'errors': sum(data['errors'] for data in samples.values()),
+        'throughput_rps': len(all_latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': _ms(percentile(all_latencies, 50)),
+        'p95_ms': _ms(percentile(all_latencies, 95)),
+        'p99_ms': _ms(percentile(all_latencies, 99)),
+    }
+    return endpoints, overall
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(target, endpoints, overall):
+    print(f"\nLoad test results: {target}")
+    print("=" * 96)
+    print(f"{'Endpoint':<44}{'Requests':>9}{'Errors':>8}{'Req/s':>10}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>9}")
+    print("-" * 96)
+    for name, stats in list(endpoints.items()) + [('TOTAL', overall)]:
+        fmt = lambda v: f"{v:.1f}" if v is not None else "-"
+        print(f"{name[:43]:<44}{stats['requests']:>9}{stats['errors']:>8}{stats['throughput_rps']:>10.1f}"
+              f"{fmt(stats['p50_ms']):>8}{fmt(stats['p95_ms']):>8}{fmt(stats['p99_ms']):>9}")
+    print("=" * 96)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Flask services")
+    parser.add_argument('target', choices=sorted(DEFAULT_MIXES), help="Service to benchmark")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent clients (default 8)")
+    parser.add_argument('--duration', type=float, default=20.0,
+                        help="Seconds to run, 0 to rely on --requests only (default 20)")
+    parser.add_argument('--requests', type=int, default=0, help="Stop after this many requests (default: no limit)")
+    parser.add_argument('--warmup', type=int, default=20, help="Requests sent before measuring (default 20)")
+    parser.add_argument('--mix', help="JSON file with the request mix")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for the request sequence")
+    parser.add_argument('--header', action='append', default=[],
+                        help="Extra request header, e.g. --header 'Accept-Encoding: gzip'")
+    parser.add_argument('--upstream-latency', type=float, default=50.0,
+                        help="Delay in ms of each offline pytrends call (trends only, default 50)")
+    parser.add_argument('--data-file', default='Master.csv', help="CSV served by the infographic app")
+    parser.add_argument('--output', help="Where to save the JSON results (default benchmarks/results/)")
+    args = parser.parse_args(argv)
+    if not args.duration and not args.requests:
+        parser.error("set --duration or --requests")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    mix = DEFAULT_MIXES[args.target]
+    if args.mix:
+        with open(args.mix, 'r', encoding='utf-8') as f:
+            mix = json.load(f)
+    headers = dict(h.split(':', 1) for h in args.header)
+    headers = {k.strip(): v.strip() for k, v in headers.items()}
+
+    app = build_app(args.target, args)
+    server = start_server(app)
+    port = server.server_port
+    print(f"Serving {args.target} on http://127.0.0.1:{port}")
+
+    try:
+        if args.warmup:
+            run_load(port, mix, min(args.concurrency, args.warmup), 0, args.warmup, args.seed, headers)
+        samples, elapsed = run_load(port, mix, args.concurrency, args.duration, args.requests,
+                                    args.seed, headers)
+    finally:
+        server.shutdown()
+
+    endpoints, overall = summarize(samples, elapsed)
+    print_report(args.target, endpoints, overall)
+
+    result = {
+        'target': args.target,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'max_requests': args.requests,
+            'warmup_requests': args.warmup,
+            'seed': args.seed,
+            'headers': headers,
+            'upstream_latency_ms': args.upstream_latency if args.target == 'trends' else None,
+            'mix': mix,
+        },
+        'elapsed_s': round(elapsed, 3),
+        'overall': overall,
+        'endpoints': endpoints,
+    }
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"{args.target}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()